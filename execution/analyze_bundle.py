@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+analyze_bundle.py - Report bundle sizes and budgets for a build's dist output
+
+Usage:
+    python analyze_bundle.py <project_or_dist_path> [--budgets FILE] [--markdown FILE] [--workers N]
+
+Walks dist/ (the directory vercel.json deploys) and measures every file's
+raw, gzip and brotli size. Brotli needs the optional `brotli` package
+(pip install brotli); without it brotli sizes are reported as null.
+Compression runs in a process pool, so large dists use every core.
+
+Chunks are mapped back to their sources through the Vite manifest
+(dist/.vite/manifest.json, written with build.manifest) and to the modules
+and npm packages inside them through their source maps (build.sourcemap).
+
+Size budgets are read from bundle-budgets.json in the project (or --budgets):
+    {"budgets": [
+        {"match": "assets/*.js", "gzip": "150kB"},
+        {"match": "*", "total": true, "gzip": "500kB"}
+    ]}
+Each budget limits any of raw/gzip/brotli, per matching file or, with
+"total", for all matching files together. Sizes accept B, kB, MB (1000-based)
+and KiB, MiB.
+
+Returns:
+    JSON with per-chunk sizes, module breakdowns and budget violations
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import fnmatch
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Text assets a CDN serves compressed; everything else is measured raw only
+COMPRESSIBLE = {
+    ".js", ".mjs", ".cjs", ".css", ".html", ".htm", ".svg", ".json",
+    ".txt", ".xml", ".webmanifest", ".wasm", ".ico",
+}
+
+# Below this total size a process pool costs more than it saves
+POOL_THRESHOLD = 1024 * 1024
+
+MODULES_PER_CHUNK = 20
+
+SIZE_UNITS = {"b": 1, "kb": 1000, "mb": 1000 ** 2, "kib": 1024, "mib": 1024 ** 2}
+
+BASE64_VALUES = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+def decode_vlq(segment: str) -> list:
+    """Decode one source-map mappings segment into its integer fields."""
+    values, shift, value = [], 0, 0
+    for char in segment:
+        digit = BASE64_VALUES[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        shift = value = 0
+    return values
+
+
+def module_name(source: str, source_root: str = "") -> str:
+    """Normalize a source-map source path (strip ../, webpack:// and query strings)."""
+    source = (source_root.rstrip("/") + "/" + source) if source_root else source
+    source = re.sub(r"^[a-z]+://[^/]*/", "", source).split("?")[0]
+    while source.startswith(("../", "./", "/")):
+        source = source.split("/", 1)[1]
+    return source
+
+
+def package_name(module: str) -> str:
+    """npm package a module belongs to, or None for project sources."""
+    if "node_modules/" not in module:
+        return None
+    parts = module.rsplit("node_modules/", 1)[1].split("/")
+    return "/".join(parts[:2]) if parts[0].startswith("@") else parts[0]
+
+
+def attribute_modules(source_map: dict, generated: str) -> dict:
+    """Characters of the generated file attributed to each source module.
+
+    Each mapping segment owns the generated columns up to the next segment
+    on the same line (or the end of the line).
+    """
+    sources = source_map.get("sources", [])
+    root = source_map.get("sourceRoot", "") or ""
+    line_lengths = [len(line) for line in generated.split("\n")]
+    sizes = {}
+    source_index = 0
+    for line_no, line in enumerate(source_map.get("mappings", "").split(";")):
+        line_length = line_lengths[line_no] if line_no < len(line_lengths) else 0
+        column = 0
+        segments = []
+        for segment in line.split(","):
+            if not segment:
+                continue
+            fields = decode_vlq(segment)
+            column += fields[0]
+            if len(fields) >= 4:
+                source_index += fields[1]
+                segments.append((column, source_index))
+            else:
+                segments.append((column, None))
+        for i, (start, index) in enumerate(segments):
+            if index is None or index >= len(sources):
+                continue
+            end = segments[i + 1][0] if i + 1 < len(segments) else line_length
+            if end > start:
+                sizes[index] = sizes.get(index, 0) + end - start
+    modules = {}
+    for index, size in sizes.items():
+        name = module_name(sources[index], root)
+        modules[name] = modules.get(name, 0) + size
+    return modules
+
+
+def measure_file(path: str) -> dict:
+    """Raw/gzip/brotli sizes of one file, plus its modules if it has a source map."""
+    with open(path, "rb") as f:
+        data = f.read()
+    result = {"raw": len(data), "gzip": None, "brotli": None}
+    if os.path.splitext(path)[1].lower() in COMPRESSIBLE:
+        result["gzip"] = len(gzip.compress(data, GZIP_LEVEL, mtime=0))
+        if brotli is not None:
+            result["brotli"] = len(brotli.compress(data, quality=BROTLI_QUALITY))
+
+    map_path = path + ".map"
+    if os.path.exists(map_path):
+        try:
+            with open(map_path, "r", encoding="utf-8") as f:
+                source_map = json.load(f)
+            result["modules"] = attribute_modules(source_map, data.decode("utf-8", "replace"))
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable or index-style maps: sizes only
+    return result
+
+
+def parse_size(value) -> int:
+    """Parse a budget size such as 150kB, 1.5MB, 200KiB or a byte count."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*", str(value))
+    unit = (match.group(2).lower() or "b") if match else None
+    if unit not in SIZE_UNITS:
+        raise ValueError(f"Invalid budget size: {value!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[unit])
+
+
+def load_budgets(path: Path) -> list:
+    """Read and validate a budgets file."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    budgets = data.get("budgets", []) if isinstance(data, dict) else None
+    if not isinstance(budgets, list):
+        raise ValueError(f"{path.name}: expected an object with a \"budgets\" list")
+    for budget in budgets:
+        if not isinstance(budget, dict) or not isinstance(budget.get("match"), str):
+            raise ValueError(f"{path.name}: every budget needs a \"match\" glob")
+        if not any(metric in budget for metric in ("raw", "gzip", "brotli")):
+            raise ValueError(f"{path.name}: budget {budget['match']!r} sets no raw/gzip/brotli limit")
+        for metric in ("raw", "gzip", "brotli"):
+            if metric in budget:
+                budget[metric] = parse_size(budget[metric])
+    return budgets
+
+
+def check_budgets(files: list, budgets: list) -> list:
+    """Return the budget violations for the measured files."""
+    violations = []
+    for budget in budgets:
+        matched = [f for f in files if fnmatch.fnmatch(f["file"], budget["match"])]
+        for metric in ("raw", "gzip", "brotli"):
+            if metric not in budget:
+                continue
+            limit = budget[metric]
+            if budget.get("total"):
+                sizes = [f[metric] for f in matched if f[metric] is not None]
+                if sizes and sum(sizes) > limit:
+                    violations.append({"match": budget["match"], "scope": "total", "metric": metric,
+                                       "size": sum(sizes), "limit": limit})
+                continue
+            for f in matched:
+                if f[metric] is not None and f[metric] > limit:
+                    violations.append({"match": budget["match"], "file": f["file"], "metric": metric,
+                                       "size": f[metric], "limit": limit})
+    return violations
+
+
+def read_manifest(dist: Path) -> dict:
+    """Map output files to their Vite manifest entries."""
+    for manifest_path in (dist / ".vite" / "manifest.json", dist / "manifest.json"):
+        if not manifest_path.exists():
+            continue
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        files = {}
+        for source, entry in manifest.items():
+            if not isinstance(entry, dict) or "file" not in entry:
+                continue
+            info = {
+                "source": entry.get("src", source),
+                "is_entry": bool(entry.get("isEntry")),
+                "is_dynamic_entry": bool(entry.get("isDynamicEntry")),
+                "imports": entry.get("imports", []),
+            }
+            files[entry["file"]] = info
+            for css in entry.get("css", []):
+                files.setdefault(css, {**info, "imports": []})
+        return files
+    return {}
+
+
+def find_dist(path: Path) -> Path:
+    """Accept a project directory (using its dist/) or the dist directory itself."""
+    return path / "dist" if (path / "dist").is_dir() else path
+
+
+def analyze_dist(dist: Path, budgets: list = None, workers: int = None) -> dict:
+    """Measure a dist directory and check it against budgets."""
+    paths = []
+    sourcemap_bytes = 0
+    for current, dirs, names in os.walk(dist):
+        # .vite/ holds build metadata (the manifest), not served assets
+        dirs[:] = sorted(d for d in dirs if d != ".vite")
+        for name in sorted(names):
+            path = os.path.join(current, name)
+            if name.endswith(".map"):
+                sourcemap_bytes += os.path.getsize(path)
+            else:
+                paths.append(path)
+
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    if workers == 1 or total_bytes < POOL_THRESHOLD or len(paths) < 2:
+        measured = [measure_file(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            measured = list(pool.map(measure_file, paths, chunksize=4))
+
+    manifest = read_manifest(dist)
+    files = []
+    packages = {}
+    for path, sizes in zip(paths, measured):
+        rel = os.path.relpath(path, dist).replace(os.sep, "/")
+        record = {"file": rel, "raw": sizes["raw"], "gzip": sizes["gzip"], "brotli": sizes["brotli"]}
+        if rel in manifest:
+            record.update(manifest[rel])
+        modules = sizes.get("modules")
+        if modules:
+            chunk_packages = {}
+            for module, size in modules.items():
+                package = package_name(module) or "(project)"
+                chunk_packages[package] = chunk_packages.get(package, 0) + size
+                packages[package] = packages.get(package, 0) + size
+            top = sorted(modules.items(), key=lambda item: -item[1])[:MODULES_PER_CHUNK]
+            record["modules"] = [{"module": module, "size": size} for module, size in top]
+            record["packages"] = dict(sorted(chunk_packages.items(), key=lambda item: -item[1]))
+        files.append(record)
+
+    files.sort(key=lambda f: -(f["gzip"] if f["gzip"] is not None else f["raw"]))
+
+    # Incompressible files add nothing to the gzip/brotli totals, but without
+    # a brotli module the brotli totals are unknown (null), not zero
+    metrics = ("raw", "gzip", "brotli") if brotli is not None else ("raw", "gzip")
+    by_type = {}
+    for f in files:
+        extension = os.path.splitext(f["file"])[1].lower() or "(none)"
+        totals = by_type.setdefault(extension, {"files": 0, "raw": 0, "gzip": 0,
+                                                "brotli": 0 if brotli is not None else None})
+        totals["files"] += 1
+        for metric in metrics:
+            totals[metric] += f[metric] or 0
+
+    violations = check_budgets(files, budgets or [])
+    return {
+        "success": not violations,
+        "dist": str(dist.absolute()),
+        "files": len(files),
+        "totals": {
+            "raw": sum(t["raw"] for t in by_type.values()),
+            "gzip": sum(t["gzip"] for t in by_type.values()),
+            "brotli": sum(t["brotli"] for t in by_type.values()) if brotli is not None else None,
+        },
+        "sourcemap_bytes": sourcemap_bytes,
+        "compression": {"gzip_level": GZIP_LEVEL, "brotli": BROTLI_QUALITY if brotli else None},
+        "manifest": bool(manifest),
+        "by_type": dict(sorted(by_type.items(), key=lambda item: -item[1]["raw"])),
+        "packages": dict(sorted(packages.items(), key=lambda item: -item[1])),
+        "budgets": {"checked": len(budgets or []), "violations": violations},
+        "chunks": files,
+    }
+
+
+def format_size(size) -> str:
+    if size is None:
+        return "-"
+    if size < 1000:
+        return f"{size} B"
+    if size < 1000 ** 2:
+        return f"{size / 1000:.2f} kB"
+    return f"{size / 1000 ** 2:.2f} MB"
+
+
+def generate_markdown(report: dict) -> str:
+    """Render a bundle report as markdown."""
+    totals = report["totals"]
+    lines = [
+        f"# Bundle Report: {Path(report['dist']).parent.name}",
+        "",
+        f"> Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        "",
+        "## Overview",
+        "",
+        f"- **Dist**: `{report['dist']}`",
+        f"- **Files**: {report['files']}",
+        f"- **Total**: {format_size(totals['raw'])} raw, {format_size(totals['gzip'])} gzip"
+        + (f", {format_size(totals['brotli'])} brotli" if report["compression"]["brotli"] else ""),
+        f"- **Budgets**: {report['budgets']['checked']} checked, {len(report['budgets']['violations'])} exceeded",
+        "",
+    ]
+
+    if report["budgets"]["violations"]:
+        lines.extend(["## Budget Violations", "", "| Budget | File | Metric | Size | Limit |",
+                      "|--------|------|--------|------|-------|"])
+        for v in report["budgets"]["violations"]:
+            lines.append(f"| `{v['match']}` | {v.get('file', '(total)')} | {v['metric']} | "
+                         f"{format_size(v['size'])} | {format_size(v['limit'])} |")
+        lines.append("")
+
+    lines.extend(["## Chunks", "", "| File | Raw | Gzip | Brotli | Source |",
+                  "|------|-----|------|--------|--------|"])
+    for f in report["chunks"][:30]:
+        source = f"`{f['source']}`" + (" (entry)" if f.get("is_entry") else "") if f.get("source") else ""
+        lines.append(f"| `{f['file']}` | {format_size(f['raw'])} | {format_size(f['gzip'])} | "
+                     f"{format_size(f['brotli'])} | {source} |")
+    if len(report["chunks"]) > 30:
+        lines.append(f"| ... | +{len(report['chunks']) - 30} more | | | |")
+    lines.append("")
+
+    if report["packages"]:
+        lines.extend(["## Largest Packages", "", "| Package | Size (minified) |", "|---------|-----------------|"])
+        for package, size in list(report["packages"].items())[:15]:
+            lines.append(f"| `{package}` | {format_size(size)} |")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report bundle sizes and budgets for a dist directory")
+    parser.add_argument("path", help="Project directory (uses its dist/) or a dist directory")
+    parser.add_argument("--budgets", help="Budgets JSON file (default: <project>/bundle-budgets.json)")
+    parser.add_argument("--markdown", help="Also write a markdown report to this file")
+    parser.add_argument("--workers", type=int, help="Compression processes (default: CPU count)")
+
+    args = parser.parse_args()
+    path = Path(args.path)
+    dist = find_dist(path)
+
+    if not dist.is_dir():
+        print(json.dumps({"success": False, "message": f"Dist directory not found: {dist}"}))
+        sys.exit(1)
+
+    budgets_file = Path(args.budgets) if args.budgets else dist.parent / "bundle-budgets.json"
+    try:
+        budgets = load_budgets(budgets_file) if budgets_file.exists() else []
+    except (OSError, ValueError) as e:
+        print(json.dumps({"success": False, "message": f"Invalid budgets file: {e}"}))
+        sys.exit(1)
+
+    report = analyze_dist(dist, budgets, args.workers)
+
+    if args.markdown:
+        output_path = Path(args.markdown)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(generate_markdown(report), encoding="utf-8")
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["success"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,140 +9,405 @@ Can be used with:
     - A file path containing logs
     - Piped input: echo "log text" | python analyze_vercel_logs.py -
 
+    python analyze_vercel_logs.py <log_file> --follow [--interval SECONDS]
+
+With --follow, a growing file is tailed (or stdin is read until it closes) and
+findings are emitted as JSON lines whenever they change: every --interval
+seconds, or immediately when a critical finding first appears.
+
+    python analyze_vercel_logs.py --batch <dir_or_glob> [--workers N] [--chunk-mb MB]
+
+Batch mode fans files out across a process pool. Files larger than --chunk-mb
+are split into byte ranges on line boundaries and analyzed in parallel too;
+the partial results are merged into per-file summaries and a combined report.
+
+    python analyze_vercel_logs.py <log_file> --profile [--profile-top N]
+
+--profile times every pattern on every line (no prefilter), reports the
+slowest lines per pattern and flags patterns at risk of catastrophic
+backtracking, both from their shape and by timing them on adversarial lines.
+
+Lines longer than --max-line-length (minified bundles, inline source maps) are
+scanned in bounded overlapping chunks, only their first chunk (--long-lines
+window), or skipped when they look binary/base64 (--long-lines skip), so the
+cost of one line is bounded. Reported match content is unchanged.
+
+Error patterns come from the packs in execution/patterns/ (see
+pattern_registry.py). Only the core pack, the original built-in patterns,
+loads by default; --packs core,vite etc. adds others and --packs all loads
+every pack.
+
+Compressed logs (.gz, .xz, .zst) are detected from their magic bytes and
+decompressed on a reader thread straight into the matcher; zstd needs the
+optional `zstandard` package.
+
+With --cache, the byte offset already processed and its partial findings are
+kept in .tmp/log_analysis_cache.sqlite, so re-running on an append-only log
+only scans the newly appended bytes. The processed prefix is re-hashed
+(blake2b) on each run, so a file changed anywhere before that offset is
+scanned again from the start.
+
+Input is streamed line by line, so memory stays flat regardless of log size
+(e.g. `vercel logs <url> --follow | python analyze_vercel_logs.py -`).
+
 Returns:
     JSON with categorized errors and suggested fixes
 """
 
+import io
+import os
 import sys
+import math
+import heapq
+import glob
+import gzip
+import lzma
+import hashlib
+import sqlite3
 import json
 import re
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from pattern_registry import load_registry, literal_runs, backtracking_risk, adversarial_line
 
-# Error patterns and their fixes
-ERROR_PATTERNS = {
-    "typescript_strict": {
-        "patterns": [
-            r"error TS\d+:",
-            r"Type '.*' is not assignable",
-            r"Property '.*' does not exist",
-        ],
-        "category": "TypeScript",
-        "severity": "high",
-        "fixes": [
-            "Add `typescript: { ignoreBuildErrors: true }` to next.config.js",
-            "Fix the type error in the source file",
-            "Add proper type definitions"
-        ]
-    },
-    "eslint": {
-        "patterns": [
-            r"ESLint.*error",
-            r"error\s+.*eslint",
-            r"'.*' is defined but never used",
-        ],
-        "category": "ESLint",
-        "severity": "medium",
-        "fixes": [
-            "Add `eslint: { ignoreDuringBuilds: true }` to next.config.js",
-            "Fix the linting error",
-            "Disable the specific rule with // eslint-disable-next-line"
-        ]
-    },
-    "module_not_found": {
-        "patterns": [
-            r"Cannot find module '(.*)'",
-            r"Module not found: Can't resolve '(.*)'",
-        ],
-        "category": "Missing Dependency",
-        "severity": "critical",
-        "fixes": [
-            "Run `npm install <package-name>`",
-            "Check if package is in dependencies (not devDependencies) for production",
-            "Verify import path is correct"
-        ]
-    },
-    "out_directory": {
-        "patterns": [
-            r"./out.*not found",
-            r"No such file or directory.*out",
-            r"output: 'export'",
-        ],
-        "category": "Static Export Conflict",
-        "severity": "high",
-        "fixes": [
-            "Remove `output: 'export'` from next.config.js for Vercel SSR",
-            "Disable GitHub Pages workflow if using Vercel",
-            "Delete .github/workflows/*.yml for GHP"
-        ]
-    },
-    "env_missing": {
-        "patterns": [
-            r"Environment variable.*not found",
-            r"Missing required env",
-            r"process\.env\.\w+ is undefined",
-        ],
-        "category": "Environment Variables",
-        "severity": "critical",
-        "fixes": [
-            "Add the variable to Vercel project settings",
-            "Check .env.example for required variables",
-            "Ensure env var prefix matches framework (NEXT_PUBLIC_ for client-side)"
-        ]
-    },
-    "memory": {
-        "patterns": [
-            r"JavaScript heap out of memory",
-            r"FATAL ERROR.*heap",
-        ],
-        "category": "Memory",
-        "severity": "critical",
-        "fixes": [
-            "Add NODE_OPTIONS='--max-old-space-size=4096' to build command",
-            "Optimize imports and reduce bundle size",
-            "Check for circular dependencies"
-        ]
-    },
-}
 
+# Error patterns and their fixes, loaded from the pattern packs in patterns/
+ERROR_PATTERNS = load_registry()["error_patterns"]
 
-def analyze_logs(log_text: str) -> dict:
-    """Analyze log text and categorize errors."""
-    findings = []
-    lines = log_text.split("\n")
-    
-    for error_type, config in ERROR_PATTERNS.items():
+
+def required_literal(pattern: str) -> str:
+    """Return the longest literal every match of ``pattern`` must contain.
+
+    The literal is lowercased for case-insensitive prefiltering. Returns
+    None when the pattern has no such ASCII literal (e.g. a top-level
+    alternation), so it has to be run as a regex on every line.
+    """
+    runs = [run for run in literal_runs(pattern) if run.isascii()]
+    return max(runs, key=len).lower() if runs else None
+
+
+def compile_patterns(error_patterns: dict) -> dict:
+    """Compile every pattern once, plus prefilters for the hot loop.
+
+    Most log lines match nothing, so they are rejected before any pattern
+    runs: one case-sensitive search over the lowercased line for the
+    literals each pattern requires (plus a combined regex for patterns
+    without a literal). Lines with characters that case-fold onto ASCII
+    letters use the combined case-insensitive alternation instead. Only
+    lines that pass are confirmed against each pattern, which credits every
+    matching pattern exactly like running them one by one.
+    """
+    entries = []
+    for error_type, config in error_patterns.items():
         for pattern in config["patterns"]:
-            matches = []
-            for i, line in enumerate(lines):
-                if re.search(pattern, line, re.IGNORECASE):
-                    matches.append({
-                        "line_number": i + 1,
+            entries.append({
+                "type": error_type,
+                "pattern": pattern,
+                "regex": re.compile(pattern, re.IGNORECASE),
+                "literal": required_literal(pattern),
+                "config": config,
+            })
+
+    def combine(patterns, flags=0):
+        return re.compile("|".join(f"(?:{p})" for p in patterns), flags) if patterns else None
+    
+    literals = sorted({e["literal"] for e in entries if e["literal"]}, key=len, reverse=True)
+    return {
+        "entries": entries,
+        "prefilter": combine([e["pattern"] for e in entries], re.IGNORECASE),
+        "literal_prefilter": combine([re.escape(literal) for literal in literals]),
+        "residual_prefilter": combine([e["pattern"] for e in entries if not e["literal"]], re.IGNORECASE),
+    }
+
+
+# Non-ASCII characters that IGNORECASE matches against ASCII letters but that
+# str.lower() does not map to them (long s, dotted/dotless i, Kelvin sign)
+_CASEFOLD_SPECIALS = re.compile("[\u017f\u0130\u0131\u212a]")
+
+
+def line_may_match(matcher: dict, line: str) -> bool:
+    """Cheaply decide whether any pattern could match ``line``."""
+    if not line.isascii() and _CASEFOLD_SPECIALS.search(line):
+        return matcher["prefilter"] is not None and matcher["prefilter"].search(line) is not None
+    literal, residual = matcher["literal_prefilter"], matcher["residual_prefilter"]
+    return bool((literal and literal.search(line.lower())) or (residual and residual.search(line)))
+
+
+_MATCHER = None
+
+
+def get_matcher() -> dict:
+    """Return the compiled matcher for ERROR_PATTERNS, compiling it on first use."""
+    global _MATCHER
+    if _MATCHER is None:
+        _MATCHER = compile_patterns(ERROR_PATTERNS)
+    return _MATCHER
+
+
+def use_packs(packs: list = None) -> None:
+    """Switch ERROR_PATTERNS to the given pattern packs (default: core)."""
+    global ERROR_PATTERNS, _MATCHER
+    ERROR_PATTERNS = load_registry(packs)["error_patterns"]
+    _MATCHER = None
+
+
+# How lines longer than max_length are scanned (minified bundles, source maps):
+#   chunk  - overlapping chunks of max_length chars, overlap chars apart
+#   window - only the first max_length chars
+#   skip   - skip binary/base64 payloads entirely, chunk anything else
+LONG_LINES = {"max_length": 8192, "overlap": 512, "strategy": "chunk"}
+LONG_LINE_STRATEGIES = ("chunk", "window", "skip")
+
+_BASE64_RUN = re.compile(r"[A-Za-z0-9+/=_-]{256,}")
+
+
+def set_long_line_policy(max_length: int = None, strategy: str = None, overlap: int = None) -> None:
+    """Change how over-long lines are scanned."""
+    if max_length is not None:
+        LONG_LINES["max_length"] = max(1, max_length)
+    if strategy is not None:
+        if strategy not in LONG_LINE_STRATEGIES:
+            raise ValueError(f"Unknown long-line strategy: {strategy}")
+        LONG_LINES["strategy"] = strategy
+    if overlap is not None:
+        LONG_LINES["overlap"] = max(0, overlap)
+    LONG_LINES["overlap"] = min(LONG_LINES["overlap"], LONG_LINES["max_length"] - 1)
+
+
+def looks_binary(line: str) -> bool:
+    """Detect binary garbage or a bare base64 blob from a sample of the line."""
+    sample = line[:4096]
+    if "\x00" in sample:
+        return True
+    stripped = sample.strip()
+    if _BASE64_RUN.fullmatch(stripped) and not stripped.isalpha() \
+            and not stripped.isdigit() and stripped.lower() != stripped:
+        return True
+    unprintable = sum(1 for ch in sample if not ch.isprintable() and ch not in "\t\r")
+    return unprintable > len(sample) // 10
+
+
+def line_segments(line: str) -> list:
+    """Split a line into the bounded pieces that are actually scanned.
+
+    Short lines are scanned whole. Long lines are bounded according to
+    LONG_LINES, so no regex ever runs over more than max_length characters
+    at once and worst-case time per line stays proportional to its length.
+    """
+    max_length = LONG_LINES["max_length"]
+    if len(line) <= max_length:
+        return [line]
+    
+    strategy = LONG_LINES["strategy"]
+    if strategy == "window":
+        return [line[:max_length]]
+    if strategy == "skip":
+        if looks_binary(line):
+            return []
+        marker = line.find(";base64,")
+        if marker != -1:  # inline source map / data URI: scan only what precedes it
+            line = line[:marker + len(";base64,")]
+            if len(line) <= max_length:
+                return [line]
+    
+    step = max_length - LONG_LINES["overlap"]
+    return [line[start:start + max_length] for start in range(0, len(line) - LONG_LINES["overlap"], step)]
+
+
+def init_worker(packs: list = None, long_lines: dict = None) -> None:
+    """Give a pool worker the same pattern packs and long-line policy as the parent."""
+    use_packs(packs)
+    if long_lines:
+        set_long_line_policy(long_lines["max_length"], long_lines["strategy"], long_lines["overlap"])
+
+
+def new_partial() -> dict:
+    """Create an empty partial result: bounded per-pattern state only."""
+    entries = get_matcher()["entries"]
+    return {
+        "total_lines": 0,
+        "counts": [0] * len(entries),
+        "matches": [[] for _ in entries],
+    }
+
+
+def scan_lines(lines, partial: dict = None) -> dict:
+    """Feed an iterable of lines into a partial result.
+
+    Only counts and the first 5 matches per pattern are kept, so memory stays
+    flat no matter how many lines the iterable produces.
+    """
+    if partial is None:
+        partial = new_partial()
+    matcher = get_matcher()
+    entries = matcher["entries"]
+    counts = partial["counts"]
+    examples = partial["matches"]
+    line_number = partial["total_lines"]
+    
+    max_length = LONG_LINES["max_length"]
+    
+    for line in lines:
+        line_number += 1
+        if len(line) > max_length:
+            segments = [seg for seg in line_segments(line) if line_may_match(matcher, seg)]
+            if not segments:
+                continue
+        elif line_may_match(matcher, line):
+            segments = (line,)
+        else:
+            continue
+        for idx, entry in enumerate(entries):
+            if any(entry["regex"].search(seg) for seg in segments):
+                counts[idx] += 1
+                if len(examples[idx]) < 5:  # Limit to 5 examples
+                    examples[idx].append({
+                        "line_number": line_number,
                         "content": line.strip()[:200]
                     })
-            
-            if matches:
-                findings.append({
-                    "type": error_type,
-                    "category": config["category"],
-                    "severity": config["severity"],
-                    "count": len(matches),
-                    "matches": matches[:5],  # Limit to 5 examples
-                    "suggested_fixes": config["fixes"]
-                })
+    
+    partial["total_lines"] = line_number
+    return partial
+
+
+def build_finding(partial: dict, idx: int) -> dict:
+    """Build the finding for one pattern of a partial result."""
+    entry = get_matcher()["entries"][idx]
+    config = entry["config"]
+    return {
+        "type": entry["type"],
+        "category": config["category"],
+        "severity": config["severity"],
+        "count": partial["counts"][idx],
+        "matches": partial["matches"][idx],
+        "suggested_fixes": config["fixes"]
+    }
+
+
+def build_report(partial: dict) -> dict:
+    """Turn a partial result into the JSON report."""
+    findings = [
+        build_finding(partial, idx)
+        for idx, count in enumerate(partial["counts"])
+        if count
+    ]
     
     # Sort by severity
     severity_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
     findings.sort(key=lambda x: severity_order.get(x["severity"], 99))
     
     return {
-        "total_lines": len(lines),
+        "total_lines": partial["total_lines"],
         "issues_found": len(findings),
         "findings": findings,
         "summary": generate_summary(findings)
     }
 
 
+def analyze_logs(log_text: str) -> dict:
+    """Analyze log text and categorize errors."""
+    return build_report(scan_lines(log_text.split("\n")))
+
+
+def iter_log_lines(stream):
+    """Yield lines from a text stream one at a time.
+
+    Lines come out exactly as ``text.split("\\n")`` would produce them,
+    including the empty last line after a trailing newline, so streamed and
+    in-memory analysis report the same line numbers and totals.
+    """
+    ended_with_newline = True
+    for line in stream:
+        ended_with_newline = line.endswith("\n")
+        yield line[:-1] if ended_with_newline else line
+    if ended_with_newline:
+        yield ""
+
+
+def analyze_stream(stream, threaded: bool = False) -> dict:
+    """Analyze a text stream line by line without reading it into memory.
+
+    With ``threaded`` the stream is read (and decompressed) on a reader
+    thread so that decoding overlaps with matching.
+    """
+    lines = iter_log_lines(stream)
+    if threaded:
+        lines = prefetch_lines(lines)
+    return build_report(scan_lines(lines))
+
+
+# Magic bytes of the compressed formats archived logs come in
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+
+def detect_compression(raw) -> str:
+    """Detect the compression of a buffered binary stream without consuming it."""
+    head = raw.peek(6)[:6]
+    for magic, name in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_log(raw, compression: str = None):
+    """Wrap a binary stream as a text stream, decompressing on the fly."""
+    if compression == "gzip":
+        raw = gzip.GzipFile(fileobj=raw)
+    elif compression == "xz":
+        raw = lzma.LZMAFile(raw)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst logs requires the zstandard package: pip install zstandard")
+        raw = zstandard.ZstdDecompressor().stream_reader(raw)
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="ignore")
+
+
+def prefetch_lines(lines, batch_size: int = 4096, max_batches: int = 16):
+    """Pull lines from an iterator on a background thread, in batches.
+
+    The queue is bounded, so the reader stays at most ``max_batches`` ahead
+    and memory stays flat.
+    """
+    batches = queue.Queue(maxsize=max_batches)
+    done = object()
+    failure = []
+    
+    def read():
+        try:
+            batch = []
+            for line in lines:
+                batch.append(line)
+                if len(batch) >= batch_size:
+                    batches.put(batch)
+                    batch = []
+            if batch:
+                batches.put(batch)
+        except Exception as e:
+            failure.append(e)
+        finally:
+            batches.put(done)
+    
+    threading.Thread(target=read, daemon=True).start()
+    while True:
+        batch = batches.get()
+        if batch is done:
+            break
+        yield from batch
+    if failure:
+        raise failure[0]
+
+
 def generate_summary(findings: list) -> str:
     """Generate a human-readable summary."""
     if not findings:
@@ -162,25 +427,565 @@ def generate_summary(findings: list) -> str:
     return f"Found {len(findings)} issue(s) of lower severity"
 
 
-def main():
-    if len(sys.argv) < 2:
-        # Try reading from stdin
-        if not sys.stdin.isatty():
-            log_text = sys.stdin.read()
+def follow_lines(stream, tail: bool, poll_interval: float = 0.2, idle_timeout: float = 0.1):
+    """Yield lines from a live stream, or None whenever no line arrived in time.
+
+    A reader thread does the blocking reads so the caller can flush deltas on
+    schedule even while the stream is quiet. With ``tail`` the stream is a
+    regular file that is polled for appended data forever; otherwise the
+    generator ends when the stream closes.
+    """
+    lines = queue.Queue(maxsize=10000)
+    done = object()
+    
+    def read_tail():
+        pending = ""
+        while True:
+            chunk = stream.readline()
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            pending += chunk
+            if pending.endswith("\n"):
+                lines.put(pending[:-1])
+                pending = ""
+    
+    def read_until_closed():
+        for line in iter_log_lines(stream):
+            lines.put(line)
+        lines.put(done)
+    
+    reader = threading.Thread(target=read_tail if tail else read_until_closed, daemon=True)
+    reader.start()
+    
+    while True:
+        try:
+            line = lines.get(timeout=idle_timeout)
+        except queue.Empty:
+            yield None
+            continue
+        if line is done:
+            return
+        yield line
+
+
+def emit_delta(partial: dict, idx: int, out) -> None:
+    """Write one JSON-lines delta for a changed finding."""
+    finding = build_finding(partial, idx)
+    report = build_report(partial)
+    out.write(json.dumps({
+        "event": "finding",
+        "type": finding["type"],
+        "pattern": get_matcher()["entries"][idx]["pattern"],
+        "count": finding["count"],
+        "finding": finding,
+        "total_lines": report["total_lines"],
+        "issues_found": report["issues_found"],
+        "summary": report["summary"],
+    }) + "\n")
+    out.flush()
+
+
+def follow_logs(stream, tail: bool, interval: float = 1.0, out=sys.stdout) -> dict:
+    """Incrementally analyze a live stream, emitting deltas as findings change.
+
+    Changed findings are flushed every ``interval`` seconds; a critical
+    finding seen for the first time is flushed immediately.
+    """
+    partial = new_partial()
+    entries = get_matcher()["entries"]
+    dirty = set()
+    last_flush = time.monotonic()
+    
+    for line in follow_lines(stream, tail):
+        if line is not None:
+            before = list(partial["counts"])
+            scan_lines([line], partial)
+            for idx, count in enumerate(partial["counts"]):
+                if count == before[idx]:
+                    continue
+                if before[idx] == 0 and entries[idx]["config"]["severity"] == "critical":
+                    emit_delta(partial, idx, out)
+                    dirty.discard(idx)
+                else:
+                    dirty.add(idx)
+        
+        now = time.monotonic()
+        if dirty and now - last_flush >= interval:
+            for idx in sorted(dirty):
+                emit_delta(partial, idx, out)
+            dirty.clear()
+            last_flush = now
+    
+    for idx in sorted(dirty):
+        emit_delta(partial, idx, out)
+    report = build_report(partial)
+    out.write(json.dumps({"event": "final", **report}) + "\n")
+    out.flush()
+    return report
+
+
+def probe_backtracking(entry: dict, repeats: tuple = (200, 800)) -> dict:
+    """Measure how a pattern's search time grows on adversarial lines.
+
+    Returns the static shape analysis plus the growth exponent of search
+    time versus line length (~1 linear, ~2 quadratic). "risk" is confirmed
+    by the measurement, so a shape that looks risky but stays linear (e.g.
+    "[^"]+" stopping at its delimiter) is not flagged. Patterns with
+    exponential shape are not run, since probing them could hang.
+    """
+    shape = backtracking_risk(entry["pattern"])
+    result = {"static_risk": shape["risk"], "reasons": shape["reasons"]}
+    if shape["risk"] == "exponential":
+        return {**result, "risk": "exponential", "growth_exponent": None}
+    
+    timings = []
+    for count in repeats:
+        line = adversarial_line(entry["pattern"], count)
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            entry["regex"].search(line)
+            best = min(best, time.perf_counter() - start)
+        timings.append((len(line), max(best, 1e-7)))
+    
+    (short_len, short_time), (long_len, long_time) = timings
+    exponent = math.log(long_time / short_time) / math.log(long_len / short_len)
+    return {
+        **result,
+        "risk": "quadratic" if exponent >= 1.5 else None,
+        "growth_exponent": round(exponent, 2),
+        "adversarial_ms": round(long_time * 1000, 3),
+    }
+
+
+def profile_patterns(lines, top: int = 3) -> dict:
+    """Time every pattern against every line and keep the slowest lines.
+
+    Unlike scan_lines there is no prefilter, so the numbers show what each
+    pattern would cost in the hot loop on its own.
+    """
+    entries = get_matcher()["entries"]
+    totals = [0] * len(entries)
+    hits = [0] * len(entries)
+    worst = [[] for _ in entries]  # min-heaps of (ns, line_number, content, length)
+    line_count = 0
+    total_chars = 0
+    clock = time.perf_counter_ns
+    
+    for line_number, line in enumerate(lines, 1):
+        line_count = line_number
+        total_chars += len(line)
+        for idx, entry in enumerate(entries):
+            start = clock()
+            matched = entry["regex"].search(line)
+            elapsed = clock() - start
+            totals[idx] += elapsed
+            if matched:
+                hits[idx] += 1
+            heap = worst[idx]
+            if len(heap) < top:
+                heapq.heappush(heap, (elapsed, line_number, line.strip()[:200], len(line)))
+            elif elapsed > heap[0][0]:
+                heapq.heapreplace(heap, (elapsed, line_number, line.strip()[:200], len(line)))
+    
+    grand_total = sum(totals) or 1
+    patterns = []
+    for idx, entry in enumerate(entries):
+        patterns.append({
+            "type": entry["type"],
+            "pattern": entry["pattern"],
+            "total_ms": round(totals[idx] / 1e6, 3),
+            "share": round(totals[idx] / grand_total, 4),
+            "mean_us": round(totals[idx] / 1e3 / max(line_count, 1), 3),
+            "hits": hits[idx],
+            "worst_lines": [
+                {"line_number": n, "us": round(ns / 1e3, 1), "length": length, "content": content}
+                for ns, n, content, length in sorted(worst[idx], reverse=True)
+            ],
+            "backtracking": probe_backtracking(entry),
+        })
+    patterns.sort(key=lambda p: -p["total_ms"])
+    
+    return {
+        "total_lines": line_count,
+        "total_chars": total_chars,
+        "patterns": patterns,
+        "flagged": [
+            {"type": p["type"], "pattern": p["pattern"], **p["backtracking"]}
+            for p in patterns if p["backtracking"]["risk"]
+        ],
+    }
+
+
+def merge_partials(a: dict, b: dict, contiguous: bool = True) -> dict:
+    """Merge two partial results into a new one.
+
+    With ``contiguous`` the partials are consecutive byte ranges of one log
+    split on a line boundary: ``a`` ends with the empty line after its last
+    newline, which is the first line of ``b``, and ``b``'s line numbers are
+    shifted past ``a``. Otherwise they are independent logs and line counts
+    simply add up. Either way the merge is associative, so chunks and files
+    can be reduced in any grouping.
+    """
+    shift = a["total_lines"] - 1 if contiguous else 0
+    matches = []
+    for a_matches, b_matches in zip(a["matches"], b["matches"]):
+        merged = list(a_matches[:5])
+        for match in b_matches[:5 - len(merged)]:
+            merged.append({**match, "line_number": match["line_number"] + shift})
+        matches.append(merged)
+    return {
+        "total_lines": a["total_lines"] + b["total_lines"] - (1 if contiguous else 0),
+        "counts": [x + y for x, y in zip(a["counts"], b["counts"])],
+        "matches": matches,
+    }
+
+
+def split_chunks(path: Path, chunk_size: int) -> list:
+    """Split a file into (start, end) byte ranges that end on a newline."""
+    size = path.stat().st_size
+    if size <= chunk_size:
+        return [(0, size)]
+    with open(path, "rb") as f:
+        if detect_compression(f):
+            return [(0, size)]
+    
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def analyze_range(path: str, start: int, end: int) -> dict:
+    """Analyze the byte range [start, end) of a log file into a partial result.
+
+    Compressed files are never split, so they are decompressed as a whole.
+    """
+    with open(path, "rb") as f:
+        compression = detect_compression(f)
+        if compression:
+            return scan_lines(prefetch_lines(iter_log_lines(open_log(f, compression))))
+        raw = io.BufferedReader(ByteRangeReader(f, start, end))
+        return scan_lines(iter_log_lines(open_log(raw)))
+
+
+class ByteRangeReader(io.RawIOBase):
+    """Raw reader over the byte range [start, end) of an open binary file."""
+    
+    def __init__(self, f, start: int, end: int):
+        f.seek(start)
+        self._file = f
+        self._remaining = max(0, end - start)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".tmp"
+CACHE_DB = CACHE_DIR / "log_analysis_cache.sqlite"
+
+HASH_BLOCK = 1024 * 1024
+
+
+def patterns_fingerprint() -> str:
+    """Hash the active patterns and long-line policy so cached partials never outlive them."""
+    signature = [(entry["type"], entry["pattern"]) for entry in get_matcher()["entries"]]
+    signature.append(sorted(LONG_LINES.items()))
+    return hashlib.sha256(json.dumps(signature).encode("utf-8")).hexdigest()
+
+
+def hash_range(path: Path, start: int, end: int, digest=None):
+    """Feed the bytes [start, end) of a file into a blake2b digest and return it.
+
+    Pass the digest of [0, start) to extend it to a digest of [0, end).
+    """
+    digest = digest or hashlib.blake2b()
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def last_line_boundary(path: Path, start: int, size: int, block: int = 64 * 1024) -> int:
+    """Return the offset just past the last newline in [start, size), or start."""
+    with open(path, "rb") as f:
+        end = size
+        while end > start:
+            begin = max(start, end - block)
+            f.seek(begin)
+            pos = f.read(end - begin).rfind(b"\n")
+            if pos != -1:
+                return begin + pos + 1
+            end = begin
+    return start
+
+
+def open_cache(db_path: Path = CACHE_DB) -> sqlite3.Connection:
+    """Open (and create if needed) the incremental analysis cache."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS log_cache (
+            path TEXT PRIMARY KEY,
+            device INTEGER,
+            inode INTEGER,
+            offset INTEGER,
+            prefix_hash TEXT,
+            patterns TEXT,
+            partial TEXT,
+            updated REAL
+        )
+    """)
+    return conn
+
+
+def analyze_file_cached(path: Path, db_path: Path = CACHE_DB) -> dict:
+    """Analyze a plain log file, only scanning bytes appended since the last run.
+
+    The cache stores the offset of the last complete line already scanned,
+    a blake2b digest of that whole prefix and its partial findings. The
+    prefix is re-hashed on every run (a plain read, far cheaper than
+    matching it) and the same digest is then extended over the newly
+    scanned bytes. If the file was replaced, truncated or changed anywhere
+    in the prefix, or the pattern set changed, it falls back to a full scan.
+    """
+    path = path.resolve()
+    st = path.stat()
+    size = st.st_size
+    patterns = patterns_fingerprint()
+    
+    conn = open_cache(db_path)
+    try:
+        row = conn.execute(
+            "SELECT device, inode, offset, prefix_hash, patterns, partial FROM log_cache WHERE path = ?",
+            (str(path),),
+        ).fetchone()
+        
+        cached, start, digest = None, 0, None
+        if row:
+            device, inode, offset, stored_hash, stored_patterns, partial_json = row
+            if (device, inode, stored_patterns) == (st.st_dev, st.st_ino, patterns) and offset <= size:
+                digest = hash_range(path, 0, offset)
+                if digest.hexdigest() == stored_hash:
+                    cached, start = json.loads(partial_json), offset
+        if cached is None:
+            digest = None
+        
+        boundary = last_line_boundary(path, start, size)
+        complete = cached
+        if boundary > start:
+            scanned = analyze_range(str(path), start, boundary)
+            complete = merge_partials(cached, scanned) if cached else scanned
+        
+        if complete is not None and (cached is None or boundary > start):
+            # Extends the verified prefix digest (or hashes from 0 after a full scan)
+            digest = hash_range(path, start, boundary, digest)
+            conn.execute(
+                "INSERT OR REPLACE INTO log_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(path), st.st_dev, st.st_ino, boundary, digest.hexdigest(),
+                 patterns, json.dumps(complete), time.time()),
+            )
+            conn.commit()
+    finally:
+        conn.close()
+    
+    # The unterminated last line (if any) is scanned every time, never cached
+    rest = analyze_range(str(path), boundary, size)
+    return build_report(merge_partials(complete, rest) if complete else rest)
+
+
+def find_log_files(target: str) -> list:
+    """Expand a directory or glob into a sorted list of log files."""
+    path = Path(target)
+    if path.is_dir():
+        return sorted(str(p) for p in path.rglob("*") if p.is_file())
+    return sorted(p for p in glob.glob(target, recursive=True) if os.path.isfile(p))
+
+
+def analyze_files(paths: list, workers: int = None, chunk_size: int = 64 * 1024 * 1024,
+                  packs: list = None) -> dict:
+    """Analyze many log files in a process pool and merge the partial results.
+
+    Returns per-file reports keyed by path plus a combined report whose
+    example matches are tagged with the file they came from.
+    """
+    tasks = []
+    for path in paths:
+        for start, end in split_chunks(Path(path), chunk_size):
+            tasks.append((path, start, end))
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(packs, dict(LONG_LINES))) as pool:
+        partials = list(pool.map(analyze_range, *zip(*tasks))) if tasks else []
+    
+    per_file = {}
+    for (path, _, _), partial in zip(tasks, partials):
+        if path in per_file:
+            per_file[path] = merge_partials(per_file[path], partial)
         else:
-            print("Usage: python analyze_vercel_logs.py <log_file>")
-            print("   or: cat logs.txt | python analyze_vercel_logs.py -")
+            per_file[path] = partial
+    
+    combined = None
+    for path, partial in per_file.items():
+        tagged = {
+            **partial,
+            "matches": [[{"file": path, **m} for m in ms] for ms in partial["matches"]],
+        }
+        combined = tagged if combined is None else merge_partials(combined, tagged, contiguous=False)
+    
+    return {
+        "files": {path: build_report(partial) for path, partial in per_file.items()},
+        "combined": build_report(combined if combined is not None else new_partial()),
+    }
+
+
+def summarize_batch(result: dict) -> dict:
+    """Reduce batch results to per-file summaries plus the combined report."""
+    def finding_counts(report):
+        counts = {}
+        for finding in report["findings"]:
+            counts[finding["type"]] = counts.get(finding["type"], 0) + finding["count"]
+        return counts
+    
+    return {
+        "files_analyzed": len(result["files"]),
+        "files": {
+            path: {
+                "total_lines": report["total_lines"],
+                "issues_found": report["issues_found"],
+                "finding_counts": finding_counts(report),
+                "summary": report["summary"],
+            }
+            for path, report in result["files"].items()
+        },
+        "combined": result["combined"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse and analyze Vercel deployment logs")
+    parser.add_argument("log_file", nargs="?", help="Log file path, or - for stdin")
+    parser.add_argument("--follow", "-f", action="store_true",
+                        help="Tail the log and emit JSON-lines deltas as findings change")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between delta flushes in --follow mode (default: 1.0)")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB",
+                        help="Analyze every log file in a directory or glob in parallel")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes for --batch or a chunked single file (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=int, default=64,
+                        help="Split files larger than this into parallel chunks (default: 64)")
+    parser.add_argument("--packs",
+                        help="Comma-separated pattern packs to use "
+                             "(default: core; 'all' for every pack)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every pattern and flag slow or backtracking-prone patterns")
+    parser.add_argument("--profile-top", type=int, default=3,
+                        help="Slowest lines to keep per pattern with --profile (default: 3)")
+    parser.add_argument("--max-line-length", type=int, default=LONG_LINES["max_length"],
+                        help="Lines longer than this many chars get the --long-lines treatment (default: 8192)")
+    parser.add_argument("--long-lines", choices=LONG_LINE_STRATEGIES, default=LONG_LINES["strategy"],
+                        help="chunk: overlapping chunks, window: first chunk only, "
+                             "skip: drop binary/base64 lines (default: chunk)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse findings for the already-scanned prefix of an append-only log")
+    
+    args = parser.parse_args()
+    chunk_size = args.chunk_mb * 1024 * 1024
+    packs = [p.strip() for p in args.packs.split(",") if p.strip()] if args.packs else None
+    set_long_line_policy(args.max_line_length, args.long_lines)
+    
+    if packs:
+        try:
+            use_packs(packs)
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+    
+    if args.batch:
+        paths = find_log_files(args.batch)
+        if not paths:
+            print(json.dumps({"error": f"No log files found: {args.batch}"}))
             sys.exit(1)
-    elif sys.argv[1] == "-":
-        log_text = sys.stdin.read()
+        try:
+            result = analyze_files(paths, args.workers, chunk_size, packs)
+        except ImportError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+        print(json.dumps(summarize_batch(result), indent=2))
+        return
+    
+    if args.log_file is None and sys.stdin.isatty():
+        print("Usage: python analyze_vercel_logs.py <log_file>")
+        print("   or: cat logs.txt | python analyze_vercel_logs.py -")
+        sys.exit(1)
+    
+    if args.log_file in (None, "-"):
+        compression = detect_compression(sys.stdin.buffer)
+        try:
+            stream = open_log(sys.stdin.buffer, compression) if compression else sys.stdin
+        except ImportError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+        if args.follow:
+            follow_logs(stream, tail=False, interval=args.interval)
+            return
+        if args.profile:
+            result = profile_patterns(iter_log_lines(stream), args.profile_top)
+        else:
+            result = analyze_stream(stream, threaded=compression is not None)
     else:
-        log_path = Path(sys.argv[1])
+        log_path = Path(args.log_file)
         if not log_path.exists():
             print(json.dumps({"error": f"File not found: {log_path}"}))
             sys.exit(1)
-        log_text = log_path.read_text(encoding="utf-8", errors="ignore")
+        if args.workers and not (args.follow or args.profile):
+            result = analyze_files([str(log_path)], args.workers, chunk_size, packs)
+            print(json.dumps(result["files"][str(log_path)], indent=2))
+            return
+        with open(log_path, "rb") as raw:
+            compression = detect_compression(raw)
+            if args.cache and compression is None and not (args.follow or args.profile):
+                print(json.dumps(analyze_file_cached(log_path), indent=2))
+                return
+            try:
+                f = open_log(raw, compression)
+            except ImportError as e:
+                print(json.dumps({"error": str(e)}))
+                sys.exit(1)
+            if args.follow:
+                try:
+                    follow_logs(f, tail=compression is None, interval=args.interval)
+                except KeyboardInterrupt:
+                    pass
+                return
+            if args.profile:
+                result = profile_patterns(iter_log_lines(f), args.profile_top)
+            else:
+                result = analyze_stream(f, threaded=compression is not None)
     
-    result = analyze_logs(log_text)
     print(json.dumps(result, indent=2))
 
 
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+benchmark_log_analyzers.py - Measure throughput of the log analyzers
+
+Usage:
+    python benchmark_log_analyzers.py [--sizes 1MB,10MB,100MB] [--density 0.01]
+                                      [--flavor mixed] [--seed 42]
+                                      [--save-baseline FILE] [--compare FILE]
+
+Generates deterministic synthetic Vercel / Next.js / Vite build logs in
+.tmp/bench/ (reused across runs), then benchmarks:
+    - analyze_stream:  analyze_vercel_logs streaming a file
+    - analyze_logs:    analyze_vercel_logs on an in-memory string
+    - parse_errors:    check_build.parse_errors on an in-memory string
+
+Each target runs in a fresh process so peak RSS is measured in isolation.
+
+Returns:
+    JSON with lines/sec, MB/sec and peak RSS per target and size, plus the
+    cost of every pattern. Exit code 1 if --compare finds a regression or
+    the baseline was recorded with other sizes, density, flavor or seed.
+"""
+
+import os
+import sys
+import json
+import re
+import time
+import random
+import argparse
+import multiprocessing
+import queue
+from pathlib import Path
+
+import analyze_vercel_logs
+import check_build
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+BENCH_DIR = Path(__file__).resolve().parent.parent / ".tmp" / "bench"
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+TARGETS = ("analyze_stream", "analyze_logs", "parse_errors")
+TARGET_TIMEOUT = 600  # seconds
+
+# Healthy build output, per flavor
+NOISE_LINES = {
+    "vercel": [
+        "Running build in Washington, D.C., USA (East) – iad1",
+        "Cloning github.com/{org}/{repo} (Branch: main, Commit: {sha})",
+        "Cloning completed: {ms}ms",
+        "Restored build cache from previous deployment ({sha})",
+        "Running \"vercel build\"",
+        "Vercel CLI 39.{n}.0",
+        "Installing dependencies...",
+        "added {n} packages, and audited {n2} packages in {s}s",
+        "found 0 vulnerabilities",
+        "Build Completed in /vercel/output [{s}s]",
+        "Deploying outputs...",
+        "Deployment completed",
+        "Uploading build cache [{n}.{n2} MB]...",
+    ],
+    "nextjs": [
+        "   ▲ Next.js 15.{n}.0",
+        "   Creating an optimized production build ...",
+        " ✓ Compiled successfully",
+        "   Linting and checking validity of types ...",
+        "   Collecting page data ...",
+        " ✓ Generating static pages ({n}/{n2})",
+        "   Finalizing page optimization ...",
+        "Route (app)                              Size     First Load JS",
+        "┌ ○ /                                    {n}.{n2} kB        {n2} kB",
+        "├ ○ /_not-found                          {n} B          {n2} kB",
+        "+ First Load JS shared by all            {n2} kB",
+    ],
+    "vite": [
+        "> website@0.0.0 build",
+        "> tsc -b && vite build",
+        "vite v7.{n}.1 building for production...",
+        "transforming...",
+        "✓ {n2} modules transformed.",
+        "rendering chunks...",
+        "computing gzip size...",
+        "dist/index.html                   {n}.{n2} kB │ gzip:  {n}.{n2} kB",
+        "dist/assets/index-{sha}.css      {n2}.{n} kB │ gzip:  {n}.{n2} kB",
+        "dist/assets/index-{sha}.js      {n2}.{n} kB │ gzip: {n2}.{n} kB",
+        "✓ built in {s}s",
+    ],
+}
+
+# Failing build output, per flavor
+ERROR_LINES = {
+    "vercel": [
+        "Error: Environment variable {VAR} not found",
+        "Missing required env var {VAR}",
+        "FATAL ERROR: Reached heap limit Allocation failed - JavaScript heap out of memory",
+        "Error: No such file or directory, scandir '/vercel/path0/out'",
+        "Error: Command \"npm run build\" exited with 1",
+    ],
+    "nextjs": [
+        "./src/app/page.tsx:{n}:{n2}",
+        "Type error: Type 'string' is not assignable to type 'number'.",
+        "Error: Cannot find module '{pkg}'",
+        "Module not found: Can't resolve '{pkg}'",
+        "Error occurred prerendering page \"/{route}\". Read more: https://nextjs.org/docs/messages/prerender-error",
+        "{n}:{n2}  Error: '{ident}' is defined but never used.  @typescript-eslint/no-unused-vars",
+        "Failed to compile.",
+    ],
+    "vite": [
+        "src/components/Hero.tsx({n},{n2}): error TS2339: Property '{ident}' does not exist on type 'Props'.",
+        "src/App.tsx({n},{n2}): error TS6133: '{ident}' is declared but its value is never read.",
+        "[vite]: Rollup failed to resolve import \"{pkg}\" from \"src/main.tsx\".",
+        "error during build:",
+        "(!) Some chunks are larger than 500 kB after minification.",
+        "SyntaxError: Unexpected token '<'",
+    ],
+}
+
+PACKAGES = ["framer-motion", "lucide-react", "react-dom/client", "@vercel/analytics", "zod", "./Hero"]
+IDENTS = ["setOpen", "props", "isMobile", "ContactDock", "handleClick", "theme"]
+VARS = ["DATABASE_URL", "NEXT_PUBLIC_API_URL", "FIRECRAWL_API_KEY", "STRIPE_SECRET"]
+
+
+def parse_size(text: str) -> int:
+    """Parse a size like 10MB or 1GB into bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]B)?\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS.get(match.group(2) or "MB"))
+
+
+def fill_template(template: str, rng: random.Random) -> str:
+    """Fill a log line template with deterministic pseudo-random values."""
+    return template.format(
+        org="ianochieng", repo="ian-personal-website",
+        sha="".join(rng.choice("0123456789abcdef") for _ in range(8)),
+        ms=rng.randint(100, 2000), s=f"{rng.uniform(1, 90):.2f}",
+        n=rng.randint(0, 99), n2=rng.randint(100, 999),
+        pkg=rng.choice(PACKAGES), ident=rng.choice(IDENTS), VAR=rng.choice(VARS),
+        route=rng.choice(["", "about", "blog/[slug]", "pricing"]),
+    )
+
+
+def generate_log(path: Path, size: int, density: float = 0.01,
+                 flavor: str = "mixed", seed: int = 42) -> dict:
+    """Write a deterministic synthetic build log of roughly ``size`` bytes.
+
+    ``density`` is the fraction of lines drawn from failing-build output.
+    The same arguments always produce the same file.
+    """
+    flavors = list(NOISE_LINES) if flavor == "mixed" else [flavor]
+    rng = random.Random(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    lines = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < size:
+            source = ERROR_LINES if rng.random() < density else NOISE_LINES
+            line = fill_template(rng.choice(source[rng.choice(flavors)]), rng) + "\n"
+            f.write(line)
+            written += len(line.encode("utf-8"))
+            lines += 1
+
+    return {"path": str(path), "bytes": written, "lines": lines}
+
+
+def ensure_log(size: int, density: float, flavor: str, seed: int) -> dict:
+    """Generate a benchmark log once and reuse it on later runs."""
+    path = BENCH_DIR / f"{flavor}-{size}-{density}-{seed}.log"
+    if path.exists():
+        with open(path, "rb") as f:
+            lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+        return {"path": str(path), "bytes": path.stat().st_size, "lines": lines}
+    # Generate under a temporary name so an interrupted run never leaves a
+    # truncated log behind to be reused
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        log = generate_log(tmp_path, size, density, flavor, seed)
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return {**log, "path": str(path)}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_target(target: str, path: str, results) -> None:
+    """Run one benchmark target in this (fresh) process and report timings."""
+    start = time.perf_counter()
+    if target == "analyze_stream":
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            analyze_vercel_logs.analyze_stream(f)
+    else:
+        text = Path(path).read_text(encoding="utf-8", errors="ignore")
+        start = time.perf_counter()
+        if target == "analyze_logs":
+            analyze_vercel_logs.analyze_logs(text)
+        elif target == "parse_errors":
+            check_build.parse_errors(text)
+        else:
+            raise ValueError(f"Unknown target: {target}")
+    results.put({"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()})
+
+
+def benchmark_target(target: str, log: dict, timeout: float = TARGET_TIMEOUT) -> dict:
+    """Benchmark a target against a generated log in a spawned process.
+
+    Raises RuntimeError if the process dies without reporting or takes
+    longer than ``timeout`` seconds.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=run_target, args=(target, log["path"], results))
+    proc.start()
+    deadline = time.monotonic() + timeout
+    measured = None
+    while measured is None and time.monotonic() < deadline:
+        alive = proc.is_alive()
+        try:
+            measured = results.get(timeout=1)
+        except queue.Empty:
+            if not alive:
+                break  # Exited (and flushed the queue) without a result
+    proc.join(timeout=5)
+    timed_out = proc.is_alive()
+    if timed_out:
+        proc.terminate()
+        proc.join()
+    if measured is None or proc.exitcode != 0:
+        reason = f"timed out after {timeout}s" if timed_out else f"exited with code {proc.exitcode}"
+        raise RuntimeError(f"{target} on {Path(log['path']).name} {reason}")
+
+    seconds = max(measured["seconds"], 1e-9)
+    return {
+        "target": target,
+        "size_mb": round(log["bytes"] / SIZE_UNITS["MB"], 2),
+        "lines": log["lines"],
+        "seconds": round(seconds, 4),
+        "lines_per_sec": round(log["lines"] / seconds),
+        "mb_per_sec": round(log["bytes"] / SIZE_UNITS["MB"] / seconds, 2),
+        "peak_rss_mb": measured["peak_rss_mb"],
+    }
+
+
+def pattern_costs(path: str, max_lines: int = 200000) -> list:
+    """Time every compiled pattern (and the line prefilter) over a sample of lines.
+
+    Costs are reported in microseconds per 1,000 lines so they compare
+    across sample sizes.
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        lines = [line.rstrip("\n") for _, line in zip(range(max_lines), f)]
+    if not lines:
+        return []
+
+    matcher = analyze_vercel_logs.get_matcher()
+    # The prefilter is timed the way analyze_vercel_logs runs it per line
+    timed = [("(prefilter)", "(line_may_match)",
+              lambda line: analyze_vercel_logs.line_may_match(matcher, line))]
+    timed += [(e["type"], e["pattern"], e["regex"].search)
+              for e in matcher["entries"]]
+
+    costs = []
+    for error_type, pattern, search in timed:
+        start = time.perf_counter()
+        hits = sum(1 for line in lines if search(line))
+        elapsed = time.perf_counter() - start
+        costs.append({
+            "type": error_type,
+            "pattern": pattern,
+            "us_per_1k_lines": round(elapsed * 1e6 * 1000 / len(lines), 1),
+            "hit_rate": round(hits / len(lines), 5),
+        })
+    costs.sort(key=lambda c: -c["us_per_1k_lines"])
+    return costs
+
+
+def settings_mismatch(baseline: dict, settings: dict) -> list:
+    """Names of the generator settings that differ from the baseline's."""
+    recorded = baseline.get("settings") or {}
+    return sorted(key for key in settings if recorded.get(key) != settings[key])
+
+
+def compare_runs(baseline: dict, current: dict, threshold: float) -> list:
+    """Flag targets whose throughput dropped or memory grew beyond ``threshold``.
+
+    Raises ValueError if the baseline was generated with different settings,
+    since its numbers are then not comparable.
+    """
+    mismatched = settings_mismatch(baseline, current["settings"])
+    if mismatched:
+        raise ValueError(f"Baseline was recorded with different settings: {', '.join(mismatched)}")
+    previous = {(r["target"], r["size_mb"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        base = previous.get((result["target"], result["size_mb"]))
+        if not base:
+            continue
+        if result["mb_per_sec"] < base["mb_per_sec"] * (1 - threshold):
+            regressions.append({
+                "target": result["target"], "size_mb": result["size_mb"], "metric": "mb_per_sec",
+                "baseline": base["mb_per_sec"], "current": result["mb_per_sec"],
+            })
+        if base.get("peak_rss_mb") and result.get("peak_rss_mb") \
+                and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append({
+                "target": result["target"], "size_mb": result["size_mb"], "metric": "peak_rss_mb",
+                "baseline": base["peak_rss_mb"], "current": result["peak_rss_mb"],
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the log analyzers on synthetic logs")
+    parser.add_argument("--sizes", default="1MB,10MB", help="Comma-separated log sizes (default: 1MB,10MB)")
+    parser.add_argument("--density", type=float, default=0.01, help="Fraction of error lines (default: 0.01)")
+    parser.add_argument("--flavor", choices=["mixed", *NOISE_LINES], default="mixed", help="Log flavor")
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--targets", default="analyze_stream,analyze_logs,parse_errors",
+                        help="Comma-separated targets to run")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Save results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Relative change that counts as a regression (default: 0.15)")
+
+    args = parser.parse_args()
+
+    try:
+        sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        print(json.dumps({"error": f"Unknown target(s): {', '.join(unknown)} "
+                                   f"(choose from {', '.join(TARGETS)})"}))
+        sys.exit(1)
+
+    result = {
+        "settings": {"sizes": sizes, "density": args.density, "flavor": args.flavor,
+                     "seed": args.seed},
+        "results": [],
+    }
+    baseline = None
+    if args.compare:
+        # Check before spending minutes on a run that can't be compared
+        try:
+            baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(json.dumps({"error": f"Could not read baseline: {e}"}))
+            sys.exit(1)
+        mismatched = settings_mismatch(baseline, result["settings"])
+        if mismatched:
+            print(json.dumps({"error": "Baseline was recorded with different settings: "
+                                       f"{', '.join(mismatched)}",
+                              "baseline_settings": baseline.get("settings"),
+                              "settings": result["settings"]}))
+            sys.exit(1)
+    largest = None
+    for size in sizes:
+        log = ensure_log(size, args.density, args.flavor, args.seed)
+        largest = log
+        for target in targets:
+            try:
+                result["results"].append(benchmark_target(target, log))
+            except RuntimeError as e:
+                print(json.dumps({"error": str(e)}))
+                sys.exit(1)
+    if largest:
+        result["pattern_costs"] = pattern_costs(largest["path"])
+
+    if args.save_baseline:
+        baseline_path = Path(args.save_baseline)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    if baseline is not None:
+        result["regressions"] = compare_runs(baseline, result, args.threshold)
+
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result.get("regressions") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+build_history.py - Record build runs and detect build regressions
+
+Usage:
+    python build_history.py record <result.json|-> --project <path>
+    python build_history.py list [--project <path>] [--limit N]
+    python build_history.py regressions [--project <path>] [--window N] [--threshold Z]
+
+Build runs are stored in .tmp/build_history.sqlite, one row per run: project,
+git commit, duration, phase timings, peak memory, bundle sizes and error
+counts. `check_build.py --record` adds rows automatically; `record` stores a
+saved check_build JSON result. Only runs of the real build are stored:
+--preflight-only and static (no-build) results take a fraction of a build's
+time and would skew the baselines.
+
+`regressions` compares each project's latest successful build with the
+rolling baseline of the successful builds before it. A metric is flagged
+when it is at least --threshold standard deviations above the baseline mean
+and more than --min-increase (relative) above it, so noise in very stable
+metrics doesn't raise alerts.
+
+Returns:
+    JSON with recorded runs or flagged regressions
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+
+HISTORY_DB = Path(__file__).resolve().parent.parent / ".tmp" / "build_history.sqlite"
+
+# Output directories, by project type, whose files make up the deployed bundle
+OUTPUT_DIRS = {
+    "vite": ["dist"],
+    "nextjs": [".next/static", "out"],
+    "node": ["dist", "build"],
+}
+
+BASELINE_WINDOW = 20
+MIN_BASELINE_RUNS = 5
+Z_THRESHOLD = 3.0
+MIN_INCREASE = 0.05
+
+
+def open_history(db_path: Path = HISTORY_DB) -> sqlite3.Connection:
+    """Open (and create if needed) the build history database."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS build_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project TEXT,
+            git_commit TEXT,
+            git_dirty INTEGER,
+            recorded REAL,
+            success INTEGER,
+            project_type TEXT,
+            duration REAL,
+            peak_rss_mb REAL,
+            cpu_seconds REAL,
+            error_count INTEGER,
+            bundle_bytes INTEGER,
+            phases TEXT,
+            bundle TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS build_runs_project ON build_runs (project, recorded)")
+    return conn
+
+
+def git_state(project_path: Path) -> tuple:
+    """Return (commit, dirty) for the project's git checkout, or (None, None)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=project_path,
+            capture_output=True, text=True, timeout=10,
+        )
+        if commit.returncode != 0:
+            return None, None
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no", "--", "."], cwd=project_path,
+            capture_output=True, text=True, timeout=10,
+        )
+        return commit.stdout.strip(), bool(status.stdout.strip())
+    except (OSError, subprocess.TimeoutExpired):
+        return None, None
+
+
+def bundle_sizes(project_path: Path, project_type: str) -> dict:
+    """Sizes of the build output: total, per extension and per file."""
+    files = {}
+    for output_dir in OUTPUT_DIRS.get(project_type, []):
+        root = project_path / output_dir
+        for current, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(current, name)
+                try:
+                    files[os.path.relpath(path, project_path).replace(os.sep, "/")] = os.path.getsize(path)
+                except OSError:
+                    continue
+
+    by_extension = {}
+    for rel, size in files.items():
+        extension = os.path.splitext(rel)[1].lower() or "(none)"
+        by_extension[extension] = by_extension.get(extension, 0) + size
+    return {"total": sum(files.values()), "by_extension": by_extension, "files": files}
+
+
+def phase_durations(timeline: dict) -> dict:
+    """Total seconds per phase name (a phase can appear more than once)."""
+    phases = {}
+    for phase in timeline.get("phases", []):
+        phases[phase["name"]] = round(phases.get(phase["name"], 0.0) + phase["duration"], 3)
+    return phases
+
+
+def is_build_run(result: dict) -> bool:
+    """Whether a check_build result comes from running the build command."""
+    return "returncode" in result and "timeline" in result
+
+
+def record_build(result: dict, project_path: Path, db_path: Path = HISTORY_DB) -> int:
+    """Store one check_build result and return its row id (None if it is not a build run)."""
+    if not is_build_run(result):
+        return None
+    project_path = project_path.resolve()
+    commit, dirty = git_state(project_path)
+    timeline = result.get("timeline", {})
+    bundle = bundle_sizes(project_path, result.get("project_type")) if result.get("success") else None
+
+    conn = open_history(db_path)
+    try:
+        cursor = conn.execute(
+            "INSERT INTO build_runs (project, git_commit, git_dirty, recorded, success, project_type, "
+            "duration, peak_rss_mb, cpu_seconds, error_count, bundle_bytes, phases, bundle) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(project_path), commit, None if dirty is None else int(dirty), time.time(),
+                int(bool(result.get("success"))), result.get("project_type"),
+                # The build's own time, so --preflight runs compare with plain ones
+                timeline.get("duration", result.get("duration_seconds")),
+                timeline.get("peak_rss_mb"), timeline.get("cpu_seconds"),
+                len(result.get("errors", [])),
+                bundle["total"] if bundle else None,
+                json.dumps(phase_durations(timeline)),
+                json.dumps(bundle) if bundle else None,
+            ),
+        )
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def run_metrics(row: sqlite3.Row) -> dict:
+    """Numeric metrics of a run that regressions are checked on."""
+    metrics = {
+        "duration": row["duration"],
+        "peak_rss_mb": row["peak_rss_mb"],
+        "cpu_seconds": row["cpu_seconds"],
+        "bundle_bytes": row["bundle_bytes"],
+    }
+    for name, seconds in json.loads(row["phases"] or "{}").items():
+        metrics[f"phase:{name}"] = seconds
+    for extension, size in (json.loads(row["bundle"]) if row["bundle"] else {}).get("by_extension", {}).items():
+        metrics[f"bundle:{extension}"] = size
+    return {name: value for name, value in metrics.items() if value is not None}
+
+
+def check_regression(value: float, baseline: list, threshold: float, min_increase: float) -> dict:
+    """Compare a value with its baseline; return the stats if it regressed, else None."""
+    mean = statistics.fmean(baseline)
+    stdev = statistics.stdev(baseline) if len(baseline) > 1 else 0.0
+    if value <= mean * (1 + min_increase):
+        return None
+    z = (value - mean) / stdev if stdev > 0 else float("inf")
+    if z < threshold:
+        return None
+    return {
+        "value": value,
+        "baseline_mean": round(mean, 3),
+        "baseline_stdev": round(stdev, 3),
+        "z_score": round(z, 2) if stdev > 0 else None,
+        "increase_percent": round(100 * (value - mean) / mean, 1) if mean else None,
+    }
+
+
+def find_regressions(project: str = None, window: int = BASELINE_WINDOW, threshold: float = Z_THRESHOLD,
+                     min_increase: float = MIN_INCREASE, min_runs: int = MIN_BASELINE_RUNS,
+                     db_path: Path = HISTORY_DB) -> list:
+    """Check each project's latest successful build against its rolling baseline."""
+    conn = open_history(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        if project:
+            projects = [str(Path(project).resolve())]
+        else:
+            projects = [row[0] for row in conn.execute("SELECT DISTINCT project FROM build_runs")]
+
+        reports = []
+        for name in projects:
+            rows = conn.execute(
+                "SELECT * FROM build_runs WHERE project = ? AND success = 1 ORDER BY recorded DESC LIMIT ?",
+                (name, window + 1),
+            ).fetchall()
+            if not rows:
+                continue
+            latest, previous = rows[0], rows[1:]
+            report = {
+                "project": name,
+                "run_id": latest["id"],
+                "git_commit": latest["git_commit"],
+                "baseline_runs": len(previous),
+                "regressions": {},
+            }
+            if len(previous) >= min_runs:
+                history = [run_metrics(row) for row in previous]
+                for metric, value in run_metrics(latest).items():
+                    baseline = [metrics[metric] for metrics in history if metric in metrics]
+                    if len(baseline) < min_runs:
+                        continue
+                    regression = check_regression(value, baseline, threshold, min_increase)
+                    if regression:
+                        report["regressions"][metric] = regression
+            else:
+                report["message"] = f"Need {min_runs} earlier successful builds for a baseline"
+            reports.append(report)
+        return reports
+    finally:
+        conn.close()
+
+
+def list_runs(project: str = None, limit: int = 20, db_path: Path = HISTORY_DB) -> list:
+    """Most recent runs, newest first."""
+    conn = open_history(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        query = ("SELECT id, project, git_commit, git_dirty, recorded, success, duration, peak_rss_mb, "
+                 "error_count, bundle_bytes, phases FROM build_runs")
+        params = []
+        if project:
+            query += " WHERE project = ?"
+            params.append(str(Path(project).resolve()))
+        query += " ORDER BY recorded DESC LIMIT ?"
+        params.append(limit)
+        runs = []
+        for row in conn.execute(query, params):
+            run = dict(row)
+            run["phases"] = json.loads(run["phases"] or "{}")
+            runs.append(run)
+        return runs
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record build runs and detect build regressions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Store a check_build.py JSON result")
+    record.add_argument("result", help="check_build.py JSON output file, or - for stdin")
+    record.add_argument("--project", required=True, help="Project directory the result belongs to")
+
+    listing = commands.add_parser("list", help="Show recent build runs")
+    listing.add_argument("--project", help="Only runs of this project")
+    listing.add_argument("--limit", type=int, default=20, help="Number of runs (default: 20)")
+
+    regressions = commands.add_parser("regressions", help="Flag builds slower or bigger than their baseline")
+    regressions.add_argument("--project", help="Only check this project")
+    regressions.add_argument("--window", type=int, default=BASELINE_WINDOW,
+                             help=f"Earlier successful builds in the baseline (default: {BASELINE_WINDOW})")
+    regressions.add_argument("--threshold", type=float, default=Z_THRESHOLD,
+                             help=f"Z-score that counts as a regression (default: {Z_THRESHOLD})")
+    regressions.add_argument("--min-increase", type=float, default=MIN_INCREASE,
+                             help=f"Minimum relative increase over the mean (default: {MIN_INCREASE})")
+    regressions.add_argument("--min-runs", type=int, default=MIN_BASELINE_RUNS,
+                             help=f"Baseline runs required before checking (default: {MIN_BASELINE_RUNS})")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        try:
+            if args.result == "-":
+                result = json.load(sys.stdin)
+            else:
+                with open(args.result, "r", encoding="utf-8") as f:
+                    result = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(json.dumps({"success": False, "message": f"Could not read build result: {e}"}))
+            sys.exit(1)
+        run_id = record_build(result, Path(args.project))
+        if run_id is None:
+            print(json.dumps({"success": False, "message": "Not a build run (preflight-only, static "
+                                                           "or failed to start) - not recorded"}))
+            sys.exit(1)
+        print(json.dumps({"success": True, "run_id": run_id}))
+
+    elif args.command == "list":
+        print(json.dumps({"runs": list_runs(args.project, args.limit)}, indent=2))
+
+    else:
+        reports = find_regressions(args.project, args.window, args.threshold, args.min_increase, args.min_runs)
+        regressed = [report for report in reports if report["regressions"]]
+        print(json.dumps({"regressed": bool(regressed), "projects": reports}, indent=2))
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
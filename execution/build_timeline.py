@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+build_timeline.py - Phase timing and resource sampling for builds
+
+Used by check_build.py. A BuildTimeline is attached to a running build:
+    - on_line() matches phase markers in the build output (tsc, vite
+      transform / rendering chunks, minify, Next.js compile and page
+      generation) and records when each phase starts and ends
+    - a sampler thread records CPU, RSS and disk I/O of the whole build
+      process tree (read from /proc on Linux, or via psutil elsewhere
+      when it is installed)
+
+timeline() returns the phases, samples and totals as JSON-ready data, and
+chrome_trace() turns one or more timelines into a Chrome trace file that
+can be opened in chrome://tracing or https://ui.perfetto.dev. Unless
+full_samples is set (check_build.py --trace), a long build keeps at most
+MAX_SAMPLES evenly spaced samples: each time the limit is reached every
+other sample is dropped and the sampling stride doubles.
+"""
+
+import os
+import re
+import sys
+import time
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+SAMPLE_INTERVAL = 0.5
+MAX_SAMPLES = 120
+
+# (marker, phase) in the order builds print them. A phase lasts until the
+# next marker; a None phase marks the end of the current one.
+PHASE_MARKERS = [
+    # npm echoes the script it runs, e.g. "> tsc -b && vite build"
+    (r"^> .*\btsc\b", "typecheck"),
+    # Vite
+    (r"\bvite v[\d.]+\S* building\b", "vite_startup"),
+    (r"^transforming\b", "transform"),
+    (r"\bmodules? transformed\b", None),
+    (r"^rendering chunks\b", "render_chunks"),
+    (r"^computing gzip size\b", "gzip_size"),
+    (r"\bbuilt in [\d.]+\s*m?s\b", None),
+    # Generic minifier output (terser, webpack plugins)
+    (r"^minif(?:y|ying)\b", "minify"),
+    # Next.js
+    (r"\bCreating an optimized production build\b", "compile"),
+    (r"\bCompiled (?:successfully|with warnings)\b", None),
+    # Whole line only, so ESLint output and file names that mention linting don't match
+    (r"^(?:info\s+-\s+)?(?:Linting and checking validity of types|Checking validity of types|Linting)"
+     r"\s*(?:\.\.\.|…)?$", "lint_typecheck"),
+    (r"\bCollecting page data\b", "collect_page_data"),
+    (r"\bGenerating static pages\b", "static_generation"),
+    (r"\bCollecting build traces\b", "build_traces"),
+    (r"\bFinalizing page optimization\b", "finalize"),
+    (r"^Route \((?:app|pages)\)", None),
+]
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+# Status glyphs builds put in front of their messages
+LINE_PREFIX = re.compile(r"^[\s✓✔▲○➜→>*-]*(?=\S)")
+
+
+def compile_markers(markers: list = PHASE_MARKERS) -> list:
+    return [(re.compile(pattern, re.IGNORECASE), phase) for pattern, phase in markers]
+
+
+def match_phase(line: str, markers: list):
+    """Return (matched, phase) for the first marker found in a line."""
+    text = ANSI_ESCAPE.sub("", line).strip()
+    if not text:
+        return False, None
+    # "> tsc" is anchored on the raw line; other markers ignore status glyphs
+    stripped = LINE_PREFIX.sub("", text)
+    for regex, phase in markers:
+        if regex.search(text) or regex.search(stripped):
+            return True, phase
+    return False, None
+
+
+def read_proc_tree(session: int) -> dict:
+    """Read {pid: (cpu_seconds, rss_bytes, read_bytes, write_bytes)} from /proc.
+
+    Builds run in their own session (start_new_session), so the process
+    tree is every process whose session id is the build's pid - the same
+    set kill_process_tree signals.
+    """
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    tree = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read().decode("utf-8", "replace")
+            # comm may contain spaces and parentheses; fields follow the last ")"
+            fields = stat[stat.rindex(")") + 2:].split()
+            if int(fields[3]) != session:
+                continue
+            cpu = (int(fields[11]) + int(fields[12])) / ticks
+            rss = int(fields[21]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+        read_bytes = write_bytes = 0
+        try:
+            with open(f"/proc/{entry}/io", "r") as f:
+                for io_line in f:
+                    key, _, value = io_line.partition(":")
+                    if key == "read_bytes":
+                        read_bytes = int(value)
+                    elif key == "write_bytes":
+                        write_bytes = int(value)
+        except (OSError, ValueError):
+            pass
+        tree[int(entry)] = (cpu, rss, read_bytes, write_bytes)
+    return tree
+
+
+def read_psutil_tree(pid: int) -> dict:
+    """Same as read_proc_tree, using psutil (macOS, Windows)."""
+    tree = {}
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return tree
+    for process in processes:
+        try:
+            cpu_times = process.cpu_times()
+            rss = process.memory_info().rss
+            try:
+                io = process.io_counters()
+                read_bytes, write_bytes = io.read_bytes, io.write_bytes
+            except (AttributeError, psutil.Error):
+                read_bytes = write_bytes = 0
+        except psutil.Error:
+            continue
+        tree[process.pid] = (cpu_times.user + cpu_times.system, rss, read_bytes, write_bytes)
+    return tree
+
+
+def tree_reader():
+    """Pick the process-tree reader for this platform, or None."""
+    if sys.platform.startswith("linux") and os.path.isdir("/proc"):
+        return read_proc_tree
+    if psutil is not None:
+        return read_psutil_tree
+    return None
+
+
+class BuildTimeline:
+    """Collects phase timings and resource samples for one build."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, markers: list = None,
+                 full_samples: bool = False):
+        self.interval = interval
+        self.full_samples = full_samples
+        self.markers = compile_markers(markers or PHASE_MARKERS)
+        self.reader = tree_reader()
+        self.started = None
+        self.started_at = None
+        self.finished = None
+        self.phases = []
+        self.current = None
+        self.samples = []
+        # Keep every stride-th sample; cpu and elapsed time since the last kept one
+        self.stride = 1
+        self.recorded = 0
+        self.pending = [0.0, 0.0]
+        self.peak_rss_mb = 0.0
+        self.stopping = threading.Event()
+        self.thread = None
+        # Per-pid cumulative counters from the previous sample
+        self.last_seen = {}
+        self.totals = {"cpu": 0.0, "read": 0, "write": 0}
+
+    def start(self, proc) -> None:
+        """Begin timing (and sampling) a freshly spawned build process."""
+        self.started = time.monotonic()
+        self.started_at = time.time()
+        if self.reader is not None:
+            self.thread = threading.Thread(target=self._sample_loop, args=(proc.pid,), daemon=True)
+            self.thread.start()
+
+    def on_line(self, stream: str, line: str, t: float) -> None:
+        """Phase-marker hook for stream_build's on_line."""
+        if self.started is None:
+            return
+        matched, phase = match_phase(line, self.markers)
+        if not matched or (self.current and self.current["name"] == phase):
+            return
+        self._close_phase(t)
+        if phase:
+            self.current = {"name": phase, "start": round(t - self.started, 3), "marker": line.strip()[:120]}
+
+    def stop(self) -> None:
+        """Close the open phase and stop sampling."""
+        if self.started is None or self.finished is not None:
+            return
+        self.finished = time.monotonic()
+        self._close_phase(self.finished)
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+
+    def _close_phase(self, t: float) -> None:
+        if self.current:
+            end = round(t - self.started, 3)
+            self.current["end"] = end
+            self.current["duration"] = round(end - self.current["start"], 3)
+            self.phases.append(self.current)
+            self.current = None
+
+    def _sample_loop(self, pid: int) -> None:
+        previous = time.monotonic()
+        while not self.stopping.wait(self.interval):
+            try:
+                tree = self.reader(pid)
+            except Exception:
+                return  # Sampling is best-effort; never break the build
+            now = time.monotonic()
+            self._record(tree, now, now - previous)
+            previous = now
+
+    def _record(self, tree: dict, now: float, elapsed: float) -> None:
+        cpu_delta = 0.0
+        for pid, (cpu, rss, read_bytes, write_bytes) in tree.items():
+            last_cpu, last_read, last_write = self.last_seen.get(pid, (0.0, 0, 0))
+            cpu_delta += max(cpu - last_cpu, 0.0)
+            self.totals["read"] += max(read_bytes - last_read, 0)
+            self.totals["write"] += max(write_bytes - last_write, 0)
+            self.last_seen[pid] = (cpu, read_bytes, write_bytes)
+        self.totals["cpu"] += cpu_delta
+        rss_mb = round(sum(values[1] for values in tree.values()) / 1048576, 1)
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        self.pending[0] += cpu_delta
+        self.pending[1] += elapsed
+        self.recorded += 1
+        if not self.full_samples and self.recorded % self.stride:
+            return
+        cpu, span = self.pending
+        self.pending = [0.0, 0.0]
+        self.samples.append({
+            "t": round(now - self.started, 3),
+            "processes": len(tree),
+            "cpu_percent": round(100 * cpu / span, 1) if span > 0 else 0.0,
+            "rss_mb": rss_mb,
+            "read_mb": round(self.totals["read"] / 1048576, 2),
+            "write_mb": round(self.totals["write"] / 1048576, 2),
+        })
+        if not self.full_samples and len(self.samples) >= MAX_SAMPLES:
+            # Later kept samples average cpu over the longer stride
+            self.samples = self.samples[1::2]
+            self.stride *= 2
+
+    def timeline(self) -> dict:
+        """Phases, samples and resource totals for the JSON report."""
+        duration = (self.finished or time.monotonic()) - self.started if self.started else 0.0
+        timeline = {
+            "started_at": self.started_at,
+            "duration": round(duration, 3),
+            "phases": self.phases,
+            "unattributed_seconds": round(max(duration - sum(p["duration"] for p in self.phases), 0.0), 3),
+            "sampling": self.reader.__name__ if self.reader else None,
+            "sample_interval": round(self.interval * (1 if self.full_samples else self.stride), 3),
+            "samples": self.samples,
+        }
+        if self.recorded:
+            timeline["peak_rss_mb"] = self.peak_rss_mb
+            timeline["cpu_seconds"] = round(self.totals["cpu"], 2)
+            timeline["avg_cpu_percent"] = round(100 * self.totals["cpu"] / duration, 1) if duration else 0.0
+            timeline["read_mb"] = round(self.totals["read"] / 1048576, 2)
+            timeline["write_mb"] = round(self.totals["write"] / 1048576, 2)
+        return timeline
+
+
+def thin_samples(timeline: dict, limit: int = MAX_SAMPLES) -> dict:
+    """A copy of timeline with at most ``limit`` evenly spaced samples."""
+    samples = timeline.get("samples", [])
+    if len(samples) <= limit:
+        return timeline
+    step = -(-len(samples) // limit)
+    return {
+        **timeline,
+        "sample_interval": round(timeline.get("sample_interval", SAMPLE_INTERVAL) * step, 3),
+        "samples": samples[step - 1::step],
+    }
+
+
+def chrome_trace(timelines: dict) -> dict:
+    """Build a Chrome trace from {label: timeline}, one track per build."""
+    starts = [t["started_at"] for t in timelines.values() if t.get("started_at")]
+    origin = min(starts) if starts else 0.0
+    events = []
+    for pid, (label, timeline) in enumerate(sorted(timelines.items()), start=1):
+        if not timeline.get("started_at"):
+            continue
+        offset = (timeline["started_at"] - origin) * 1e6
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": label}})
+        events.append({
+            "name": "build", "cat": "build", "ph": "X", "pid": pid, "tid": 1,
+            "ts": round(offset), "dur": round(timeline["duration"] * 1e6),
+        })
+        for phase in timeline["phases"]:
+            events.append({
+                "name": phase["name"], "cat": "phase", "ph": "X", "pid": pid, "tid": 2,
+                "ts": round(offset + phase["start"] * 1e6), "dur": round(phase["duration"] * 1e6),
+                "args": {"marker": phase["marker"]},
+            })
+        for sample in timeline["samples"]:
+            ts = round(offset + sample["t"] * 1e6)
+            events.append({"name": "cpu %", "ph": "C", "pid": pid, "ts": ts,
+                           "args": {"cpu": sample["cpu_percent"]}})
+            events.append({"name": "rss MB", "ph": "C", "pid": pid, "ts": ts,
+                           "args": {"rss": sample["rss_mb"]}})
+            events.append({"name": "disk MB", "ph": "C", "pid": pid, "ts": ts,
+                           "args": {"read": sample["read_mb"], "write": sample["write_mb"]}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+cache_files.py - Keyed, atomically written JSON caches under .tmp/
+
+Used by check_build.py, verify_deps.py, scan_codebase.py and
+pattern_registry.py. A cache file is named by a hash of its key (usually a
+resolved project path) and written through a temp file unique to the
+writing process and thread, then renamed over the old file, so concurrent
+runs never interleave partial writes and readers see either the old or
+the new cache.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+
+def keyed_file(cache_dir: Path, key: str) -> Path:
+    """The JSON file in cache_dir that holds the cache for key."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+    return cache_dir / f"{digest}.json"
+
+
+def write_json(path: Path, data, **dump_args) -> bool:
+    """Atomically write data as JSON to path.
+
+    Returns False instead of raising on OSError, since every cache here is
+    an optimization that a read-only tree must be able to run without.
+    """
+    tmp_file = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_args)
+        tmp_file.replace(path)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+        return False
+    return True
@@ -3,7 +3,47 @@
 check_build.py - Run local build and capture errors
 
 Usage:
-    python check_build.py <project_path>
+    python check_build.py <project_path> [--fail-fast] [--timeout SECONDS] [--trace FILE] [--record]
+    python check_build.py <project_path> --preflight | --preflight-only
+    python check_build.py <project_path> --bundle
+    python check_build.py <workspace_root> --all [--jobs N] [--build-memory-mb MB]
+
+Build output is streamed: stdout and stderr are read concurrently, parsed for
+errors line by line, and only the last 2000 characters of each are kept.
+With --fail-fast the build is killed as soon as a critical error appears
+(e.g. a missing module or heap exhaustion) instead of running to the timeout.
+
+With --all, every buildable project under the root is built concurrently.
+Parallelism is capped by CPU count and by available memory divided by
+--build-memory-mb, so parallel `npm run build` runs don't push each other out
+of memory. One JSON line is printed per project as it finishes, followed by a
+summary line with the aggregate result and wall-clock timings.
+
+For vite and nextjs projects, --preflight first runs the incremental
+type-check (`tsc -b`, reusing .tsbuildinfo) and `npm run lint` in parallel and
+only starts the full build if both are clean; --preflight-only stops after
+them, which takes seconds for a typical edit instead of a full build.
+
+Before building, node_modules is verified against package-lock.json
+(verify_deps.py), so a missing or stale install fails in well under a
+second instead of late in the build with "Cannot find module".
+
+Successful builds are cached in .tmp/build_cache/, keyed by a fingerprint
+of the source tree (skipping dependencies and build outputs), lockfile and
+config files, and on whether the preflight checks ran (--preflight).
+Files are only re-hashed when their mtime or size changed, so re-checking
+an unchanged project returns the cached result in milliseconds. Failures
+are never cached. Use --no-cache to force a build.
+
+Each build reports a "timeline": phases detected from the output (tsc, vite
+transform, rendering chunks, minify, Next.js compile and page generation)
+and periodic CPU, RSS and disk I/O samples of the build's process tree
+(thinned to at most build_timeline.MAX_SAMPLES points on long builds).
+--trace FILE keeps every sample and also writes them as a Chrome trace,
+and --record stores the run in the build history database
+(build_history.py). --bundle analyzes the dist/ output of a successful
+build (analyze_bundle.py) and fails the check when bundle-budgets.json is
+exceeded.
 
 Returns:
     JSON with build status, errors, and suggestions
@@ -13,8 +53,24 @@ import subprocess
 import sys
 import json
 import os
+import re
+import time
+import queue
+import signal
+import hashlib
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from analyze_bundle import analyze_dist, load_budgets
+from build_history import record_build
+from build_timeline import BuildTimeline, chrome_trace, thin_samples
+from cache_files import keyed_file, write_json
+from pattern_registry import load_registry
+from verify_deps import verify_dependencies
+
 
 def detect_project_type(project_path: Path) -> str:
     """Detect the project type based on config files."""
@@ -40,8 +96,379 @@ def get_build_command(project_type: str) -> list:
     return commands.get(project_type)
 
 
-def run_build(project_path: Path) -> dict:
-    """Run the build command and capture output."""
+def get_preflight_commands(project_path: Path, project_type: str) -> dict:
+    """Fast checks run before a full build: incremental type-check and lint.
+
+    ``tsc -b`` reuses its .tsbuildinfo state, so after a typical edit it only
+    re-checks the affected projects. Projects without references use
+    ``--incremental`` with a build-info file under node_modules/.tmp/.
+    """
+    if project_type not in ("vite", "nextjs"):
+        return {}
+    
+    commands = {}
+    tsconfig = project_path / "tsconfig.json"
+    if tsconfig.exists():
+        local_tsc = project_path / "node_modules" / ".bin" / "tsc"
+        tsc = [str(local_tsc)] if local_tsc.exists() else ["npx", "--no-install", "tsc"]
+        try:
+            # tsconfig.json allows comments, so look for references textually
+            text = tsconfig.read_text(encoding="utf-8")
+            has_references = re.search(r'"references"\s*:', text) is not None
+        except OSError:
+            has_references = False
+        if has_references:
+            commands["typecheck"] = tsc + ["-b"]
+        else:
+            commands["typecheck"] = tsc + [
+                "--noEmit", "--incremental",
+                "--tsBuildInfoFile", "node_modules/.tmp/preflight.tsbuildinfo",
+            ]
+    
+    try:
+        with open(project_path / "package.json", "r", encoding="utf-8") as f:
+            if "lint" in json.load(f).get("scripts", {}):
+                commands["lint"] = ["npm", "run", "lint"]
+    except (OSError, json.JSONDecodeError, AttributeError):
+        pass
+    return commands
+
+
+# Characters of stdout/stderr kept in the JSON result
+TAIL_CHARS = 2000
+
+# Default build timeout in seconds
+BUILD_TIMEOUT = 300
+
+
+class TailBuffer:
+    """Ring buffer that keeps just enough text to return the last N characters."""
+    
+    def __init__(self, limit: int = TAIL_CHARS):
+        self.limit = limit
+        self.chunks = deque()
+        self.size = 0
+    
+    def append(self, text: str) -> None:
+        self.chunks.append(text)
+        self.size += len(text)
+        while self.chunks and self.size - len(self.chunks[0]) >= self.limit:
+            self.size -= len(self.chunks.popleft())
+    
+    def text(self) -> str:
+        return "".join(self.chunks)[-self.limit:]
+
+
+def kill_process_tree(proc: subprocess.Popen) -> None:
+    """Terminate a build and everything it spawned (npm -> node -> esbuild...)."""
+    if proc.poll() is not None:
+        return
+    if sys.platform == "win32":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)], capture_output=True)
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+_CRITICAL = None
+
+
+def get_critical_matcher():
+    """Compile the registry's critical-severity patterns into one regex."""
+    global _CRITICAL
+    if _CRITICAL is None:
+        patterns = [
+            (error_type, pattern)
+            for error_type, config in load_registry()["error_patterns"].items()
+            if config["severity"] == "critical"
+            for pattern in config["patterns"]
+        ]
+        _CRITICAL = [(error_type, re.compile(pattern, re.IGNORECASE))
+                     for error_type, pattern in patterns]
+    return _CRITICAL
+
+
+def find_critical_error(line: str) -> str:
+    """Return the critical error type a line reports, if any."""
+    for error_type, regex in get_critical_matcher():
+        if regex.search(line):
+            return error_type
+    return None
+
+
+def stream_build(build_cmd: list, cwd: Path, timeout: float = BUILD_TIMEOUT,
+                 fail_fast: bool = False, on_line=None, on_spawn=None) -> dict:
+    """Run a build, consuming stdout and stderr live.
+
+    Both pipes are drained concurrently by reader threads, so neither can
+    fill up and block the build. Each line is parsed for errors as it
+    arrives and only bounded tails are kept. ``on_line(stream, line, t)`` is
+    called for every line and ``on_spawn(proc)`` once the build has started.
+    With ``fail_fast`` the process tree is killed on the first critical error.
+    """
+    proc = subprocess.Popen(
+        build_cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        shell=True if sys.platform == "win32" else False,
+        start_new_session=sys.platform != "win32",
+    )
+    if on_spawn:
+        on_spawn(proc)
+    
+    lines = queue.Queue()
+    
+    def read(name, pipe):
+        for line in pipe:
+            lines.put((name, line))
+        lines.put((name, None))
+    
+    readers = [
+        threading.Thread(target=read, args=("stdout", proc.stdout), daemon=True),
+        threading.Thread(target=read, args=("stderr", proc.stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    
+    tails = {"stdout": TailBuffer(), "stderr": TailBuffer()}
+    errors = {"stdout": [], "stderr": []}
+    open_pipes = 2
+    timed_out = False
+    aborted = None
+    deadline = time.monotonic() + timeout
+    
+    while open_pipes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        try:
+            name, line = lines.get(timeout=min(remaining, 0.5))
+        except queue.Empty:
+            continue
+        if line is None:
+            open_pipes -= 1
+            continue
+        
+        tails[name].append(line)
+        if on_line:
+            on_line(name, line, time.monotonic())
+        if len(errors[name]) < 20:
+            error = parse_error_line(line.rstrip("\n"))
+            if error:
+                errors[name].append(error)
+        if fail_fast:
+            critical = find_critical_error(line)
+            if critical:
+                aborted = {"type": critical, "line": line.strip()[:200]}
+                break
+    
+    if timed_out or aborted:
+        kill_process_tree(proc)
+    try:
+        returncode = proc.wait(timeout=max(deadline - time.monotonic(), 1))
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        kill_process_tree(proc)
+        returncode = proc.wait()
+    for reader in readers:
+        reader.join(timeout=1)
+    
+    return {
+        "returncode": returncode,
+        "timed_out": timed_out,
+        "aborted": aborted,
+        "errors": (errors["stderr"] + errors["stdout"])[:20],
+        "stdout": tails["stdout"].text(),
+        "stderr": tails["stderr"].text(),
+    }
+
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".tmp" / "build_cache"
+
+# Cached verdicts kept per project (one per source fingerprint, with or without preflight)
+CACHE_ENTRIES = 5
+
+# Directories that never hold build inputs, at any depth (hidden directories
+# such as .next and .git are skipped separately)
+BUILD_SKIP_DIRS = {"node_modules", "dist", "__pycache__", "venv"}
+
+# Build and test outputs, skipped only at the project root: nested
+# directories with these names (e.g. src/build/) may well be source
+ROOT_OUTPUT_DIRS = {"build", "out", "coverage"}
+
+
+def hash_file(path: str) -> str:
+    """Hash a file's contents."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_project(project_path: Path, known: dict = None) -> tuple:
+    """Fingerprint the files that determine a build's outcome.
+
+    Walks the project with os.scandir, skipping BUILD_SKIP_DIRS, the
+    ROOT_OUTPUT_DIRS at the project root and hidden directories (hidden
+    files such as .env are kept). ``known`` maps relative
+    paths to [mtime_ns, size, hash] from the previous run; files whose mtime
+    and size are unchanged reuse that hash instead of being read again.
+    npm's node_modules/.package-lock.json stands in for the installed
+    dependency tree. Returns (fingerprint, updated index).
+    """
+    known = known or {}
+    index = {}
+    pending = [str(project_path)]
+    files = []
+    installed = project_path / "node_modules" / ".package-lock.json"
+    if installed.exists():
+        files.append((str(installed), "node_modules/.package-lock.json", installed.stat()))
+    
+    while pending:
+        directory = pending.pop()
+        at_root = directory == str(project_path)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in BUILD_SKIP_DIRS or entry.name.startswith("."):
+                            continue
+                        if not (at_root and entry.name in ROOT_OUTPUT_DIRS):
+                            pending.append(entry.path)
+                    elif entry.is_file():
+                        rel = os.path.relpath(entry.path, project_path).replace(os.sep, "/")
+                        files.append((entry.path, rel, entry.stat()))
+        except OSError:
+            continue
+    
+    for path, rel, st in files:
+        previous = known.get(rel)
+        if previous and previous[0] == st.st_mtime_ns and previous[1] == st.st_size:
+            index[rel] = previous
+        else:
+            try:
+                index[rel] = [st.st_mtime_ns, st.st_size, hash_file(path)]
+            except OSError:
+                continue
+    
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(get_build_command(detect_project_type(project_path))).encode("utf-8"))
+    for rel in sorted(index):
+        digest.update(f"{rel}\0{index[rel][2]}\n".encode("utf-8"))
+    return digest.hexdigest(), index
+
+
+def cache_file_for(project_path: Path) -> Path:
+    """Cache file holding a project's file index and cached verdicts."""
+    return keyed_file(CACHE_DIR, str(project_path.resolve()))
+
+
+def load_build_cache(project_path: Path) -> dict:
+    """Load a project's build cache, or an empty one."""
+    try:
+        cache = json.loads(cache_file_for(project_path).read_text(encoding="utf-8"))
+        if isinstance(cache.get("files"), dict) and isinstance(cache.get("results"), dict):
+            return cache
+    except (OSError, json.JSONDecodeError):
+        pass
+    return {"files": {}, "results": {}}
+
+
+def save_build_cache(project_path: Path, cache: dict) -> None:
+    """Atomically write a project's build cache."""
+    write_json(cache_file_for(project_path), cache)
+
+
+def run_preflight(project_path: Path, commands: dict, timeout: float) -> dict:
+    """Run the preflight checks in parallel and report each one."""
+    def check(command):
+        started = time.monotonic()
+        result = stream_build(command, project_path, timeout)
+        report = {
+            "success": result["returncode"] == 0 and not result["timed_out"],
+            "command": " ".join(command),
+            "returncode": result["returncode"],
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "errors": result["errors"],
+        }
+        if result["timed_out"]:
+            report["errors"] = report["errors"] + [
+                {"type": "timeout", "message": "Preflight check timed out"}
+            ]
+        if not report["success"]:
+            report["stdout"] = result["stdout"]
+            report["stderr"] = result["stderr"]
+        return report
+    
+    with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+        futures = {name: pool.submit(check, command) for name, command in commands.items()}
+        checks = {name: future.result() for name, future in futures.items()}
+    return {"success": all(c["success"] for c in checks.values()), "checks": checks}
+
+
+def run_build(project_path: Path, fail_fast: bool = False, timeout: float = BUILD_TIMEOUT,
+              use_cache: bool = True, preflight: bool = False, preflight_only: bool = False,
+              full_samples: bool = False) -> dict:
+    """Run the build command and capture output.
+
+    With ``use_cache``, a verdict stored for the same source fingerprint is
+    returned without building; preflight runs only reuse preflight verdicts.
+    Only successful builds are cached, so a failure caused by the environment
+    (memory limits, env vars, the network) is retried on the next run.
+    With ``preflight``, the incremental type-check and lint run first and the
+    full build only starts if both are clean (``preflight_only`` stops there).
+    ``full_samples`` keeps every resource sample in the timeline (for
+    --trace); the cached copy is always thinned.
+    """
+    started = time.monotonic()
+    
+    fingerprint = None
+    if use_cache and get_build_command(detect_project_type(project_path)) is not None:
+        cache = load_build_cache(project_path)
+        fingerprint, cache["files"] = fingerprint_project(project_path, cache["files"])
+        # A passing build doesn't mean the type-check and lint pass. Only full
+        # builds are stored, and a successful fail-fast build is a full build.
+        cache_key = f"{fingerprint}:preflight" if preflight or preflight_only else fingerprint
+        cached = cache["results"].get(cache_key)
+        if cached:
+            save_build_cache(project_path, cache)
+            return {
+                **cached,
+                "cached": True,
+                "fingerprint": fingerprint,
+                "duration_seconds": round(time.monotonic() - started, 3),
+            }
+    
+    result = _run_build(project_path, fail_fast, timeout, preflight or preflight_only,
+                        preflight_only, full_samples)
+    result["duration_seconds"] = round(time.monotonic() - started, 3)
+    
+    if fingerprint and result["success"] and "returncode" in result:
+        cached = {**result, "built_at": time.time()}
+        if "timeline" in result:
+            cached["timeline"] = thin_samples(result["timeline"])
+        cache["results"][cache_key] = cached
+        while len(cache["results"]) > CACHE_ENTRIES:
+            del cache["results"][next(iter(cache["results"]))]
+        save_build_cache(project_path, cache)
+        result["fingerprint"] = fingerprint
+    return result
+
+
+def _run_build(project_path: Path, fail_fast: bool, timeout: float,
+               preflight: bool = False, preflight_only: bool = False,
+               full_samples: bool = False) -> dict:
     project_type = detect_project_type(project_path)
     build_cmd = get_build_command(project_type)
     
@@ -53,8 +480,22 @@ def run_build(project_path: Path) -> dict:
             "errors": []
         }
     
-    # Check if node_modules exists
-    if not (project_path / "node_modules").exists():
+    # Check node_modules is installed and matches package-lock.json
+    deps = verify_dependencies(project_path)
+    if not deps["ok"]:
+        if deps["status"] == "stale":
+            problems = [f"{p['package']} missing (locked {p['locked']})" for p in deps["missing"]]
+            problems += [f"{p['package']} is {p['installed']}, locked {p['locked']}"
+                         for p in deps["mismatched"]]
+            counts = f"{deps['missing_count']} missing, {deps['mismatched_count']} mismatched"
+            return {
+                "success": False,
+                "project_type": project_type,
+                "message": f"{deps['message']} ({counts})",
+                "errors": [{"type": "missing_deps", "message": problem}
+                           for problem in problems[:20]],
+                "dependencies": deps,
+            }
         return {
             "success": False,
             "project_type": project_type,
@@ -62,80 +503,324 @@ def run_build(project_path: Path) -> dict:
             "errors": [{"type": "missing_deps", "message": "node_modules directory not found"}]
         }
     
-    try:
-        result = subprocess.run(
-            build_cmd,
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            timeout=300,
-            shell=True if sys.platform == "win32" else False
-        )
-        
-        errors = parse_errors(result.stderr + result.stdout)
-        
+    preflight_commands = get_preflight_commands(project_path, project_type) if preflight else {}
+    if preflight_only and not preflight_commands:
         return {
-            "success": result.returncode == 0,
+            "success": True,
             "project_type": project_type,
-            "returncode": result.returncode,
-            "errors": errors,
-            "stdout": result.stdout[-2000:] if len(result.stdout) > 2000 else result.stdout,
-            "stderr": result.stderr[-2000:] if len(result.stderr) > 2000 else result.stderr,
+            "message": "No preflight checks available - full build skipped",
+            "errors": [],
         }
-    except subprocess.TimeoutExpired:
+    if preflight_commands:
+        try:
+            checks = run_preflight(project_path, preflight_commands, timeout)
+        except Exception as e:
+            return {
+                "success": False,
+                "project_type": project_type,
+                "message": str(e),
+                "errors": [{"type": "exception", "message": str(e)}]
+            }
+        if not checks["success"]:
+            failed = [name for name, check in checks["checks"].items() if not check["success"]]
+            return {
+                "success": False,
+                "project_type": project_type,
+                "message": f"Preflight failed ({', '.join(failed)}) - full build skipped",
+                "errors": [error for check in checks["checks"].values()
+                           for error in check["errors"]][:20],
+                "preflight": checks,
+            }
+        if preflight_only:
+            return {
+                "success": True,
+                "project_type": project_type,
+                "message": "Preflight passed - full build skipped",
+                "errors": [],
+                "preflight": checks,
+            }
+    
+    timeline = BuildTimeline(full_samples=full_samples)
+    try:
+        result = stream_build(build_cmd, project_path, timeout, fail_fast,
+                              on_line=timeline.on_line, on_spawn=timeline.start)
+    except Exception as e:
         return {
             "success": False,
             "project_type": project_type,
-            "message": "Build timed out after 5 minutes",
-            "errors": [{"type": "timeout", "message": "Build process timed out"}]
+            "message": str(e),
+            "errors": [{"type": "exception", "message": str(e)}]
         }
-    except Exception as e:
+    finally:
+        timeline.stop()
+    
+    if result["timed_out"]:
+        limit = f"{timeout / 60:g} minutes" if timeout % 60 == 0 else f"{timeout:g} seconds"
         return {
             "success": False,
             "project_type": project_type,
-            "message": str(e),
-            "errors": [{"type": "exception", "message": str(e)}]
+            "message": f"Build timed out after {limit}",
+            "errors": [{"type": "timeout", "message": "Build process timed out"}],
+            "timeline": timeline.timeline(),
         }
+    
+    build = {
+        "success": result["returncode"] == 0 and not result["aborted"],
+        "project_type": project_type,
+        "returncode": result["returncode"],
+        "errors": result["errors"],
+        "stdout": result["stdout"],
+        "stderr": result["stderr"],
+        "timeline": timeline.timeline(),
+    }
+    if preflight_commands:
+        build["preflight"] = checks
+    if result["aborted"]:
+        build["message"] = f"Build aborted early: critical {result['aborted']['type']} error"
+        build["aborted"] = result["aborted"]
+    return build
+
+
+def check_bundle(project_path: Path, result: dict) -> None:
+    """Analyze a successful build's dist/ and enforce bundle-budgets.json.
+
+    Adds a "bundle" report to the result and marks the build failed when a
+    size budget is exceeded.
+    """
+    dist = project_path / "dist"
+    if not result["success"] or not dist.is_dir():
+        return
+    budgets_file = project_path / "bundle-budgets.json"
+    try:
+        budgets = load_budgets(budgets_file) if budgets_file.exists() else []
+    except (OSError, ValueError) as e:
+        result["bundle"] = {"success": False, "message": f"Invalid budgets file: {e}"}
+        return
+    report = analyze_dist(dist, budgets)
+    result["bundle"] = report
+    violations = report["budgets"]["violations"]
+    if violations:
+        result["success"] = False
+        result["message"] = f"Bundle exceeds {len(violations)} size budget(s)"
+        result["errors"] = result["errors"] + [
+            {
+                "type": "bundle_budget",
+                "message": f"{v.get('file', v['match'] + ' (total)')}: "
+                           f"{v['metric']} {v['size']} bytes > {v['limit']}",
+            }
+            for v in violations
+        ]
+
+
+def is_buildable(project_path: Path) -> bool:
+    """True if the directory is a project with a build step to run."""
+    if get_build_command(detect_project_type(project_path)) is None:
+        return False
+    try:
+        with open(project_path / "package.json", "r", encoding="utf-8") as f:
+            return "build" in json.load(f).get("scripts", {})
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return False
+
+
+def find_projects(root: Path) -> list:
+    """Find buildable projects under root.
+
+    A project's own subdirectories are not searched further, since its build
+    already covers them.
+    """
+    projects = []
+    for current, dirs, _ in os.walk(root):
+        current_path = Path(current)
+        if is_buildable(current_path):
+            projects.append(current_path)
+            dirs[:] = []
+            continue
+        dirs[:] = sorted(d for d in dirs if d not in BUILD_SKIP_DIRS and not d.startswith("."))
+    return projects
+
+
+def available_memory_mb() -> int:
+    """Memory available for new processes, in MB (None if unknown)."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def max_parallel_builds(build_memory_mb: int = 1536) -> int:
+    """Cap concurrent builds by CPU count and by available memory."""
+    limit = os.cpu_count() or 1
+    memory = available_memory_mb()
+    if memory is not None:
+        limit = min(limit, memory // max(build_memory_mb, 1))
+    return max(1, limit)
+
+
+def check_all(root: Path, jobs: int = None, build_memory_mb: int = 1536,
+              fail_fast: bool = False, timeout: float = BUILD_TIMEOUT,
+              use_cache: bool = True, trace: Path = None, record: bool = False,
+              preflight: bool = False, preflight_only: bool = False, bundle: bool = False,
+              out=sys.stdout) -> dict:
+    """Build every project under root concurrently, streaming per-project results."""
+    started = time.monotonic()
+    projects = find_projects(root)
+    parallelism = jobs or max_parallel_builds(build_memory_mb)
+    results = {}
+    
+    with ThreadPoolExecutor(max_workers=parallelism) as pool:
+        futures = {
+            pool.submit(run_build, project, fail_fast, timeout, use_cache, preflight,
+                        preflight_only, trace is not None): project
+            for project in projects
+        }
+        for future in as_completed(futures):
+            project = str(futures[future])
+            results[project] = future.result()
+            if bundle:
+                check_bundle(futures[future], results[project])
+            if record and not results[project].get("cached"):
+                record_build(results[project], futures[future])
+            out.write(json.dumps({"event": "project", "path": project, **results[project]}) + "\n")
+            out.flush()
+    
+    summary = {
+        "event": "summary",
+        "root": str(root.absolute()),
+        "projects": len(projects),
+        "succeeded": sum(1 for r in results.values() if r["success"]),
+        "failed": sum(1 for r in results.values() if not r["success"]),
+        "parallelism": parallelism,
+        "wall_clock_seconds": round(time.monotonic() - started, 3),
+        "total_build_seconds": round(sum(r["duration_seconds"] for r in results.values()), 3),
+        "success": all(r["success"] for r in results.values()),
+        "results": {
+            str(project): {
+                "success": results[str(project)]["success"],
+                "project_type": results[str(project)]["project_type"],
+                "duration_seconds": results[str(project)]["duration_seconds"],
+                "error_count": len(results[str(project)]["errors"]),
+            }
+            for project in projects
+        },
+    }
+    if trace:
+        write_trace(trace, results)
+    out.write(json.dumps(summary) + "\n")
+    out.flush()
+    return summary
+
+
+def write_trace(trace: Path, results: dict) -> None:
+    """Write a Chrome trace of the builds' timelines, one track per project."""
+    timelines = {project: result["timeline"]
+                 for project, result in results.items() if "timeline" in result}
+    trace.parent.mkdir(parents=True, exist_ok=True)
+    trace.write_text(json.dumps(chrome_trace(timelines)), encoding="utf-8")
+
+
+_BUILD_ERRORS = None
+
+
+def get_build_error_patterns() -> list:
+    """Load build error markers from the pattern registry, compiling them once."""
+    global _BUILD_ERRORS
+    if _BUILD_ERRORS is None:
+        _BUILD_ERRORS = []
+        for entry in load_registry()["build_errors"]:
+            if entry["regex"]:
+                matcher = re.compile(entry["match"]).search
+            else:
+                matcher = lambda line, marker=entry["match"]: marker in line
+            _BUILD_ERRORS.append((entry["type"], matcher, entry["description"]))
+    return _BUILD_ERRORS
+
+
+def parse_error_line(line: str) -> dict:
+    """Return the error a single output line reports, or None."""
+    for error_type, matches, description in get_build_error_patterns():
+        if matches(line):
+            return {
+                "type": error_type,
+                "description": description,
+                "line": line.strip()[:200]
+            }
+    return None
 
 
 def parse_errors(output: str) -> list:
     """Parse common error patterns from build output."""
     errors = []
     
-    patterns = [
-        ("typescript", "error TS", "TypeScript compilation error"),
-        ("eslint", "error  ", "ESLint error"),
-        ("module_not_found", "Cannot find module", "Missing dependency"),
-        ("syntax", "SyntaxError", "Syntax error"),
-        ("type_error", "TypeError", "Type error at runtime"),
-    ]
-    
-    lines = output.split("\n")
-    for line in lines:
-        for error_type, pattern, description in patterns:
-            if pattern in line:
-                errors.append({
-                    "type": error_type,
-                    "description": description,
-                    "line": line.strip()[:200]
-                })
+    for line in output.split("\n"):
+        error = parse_error_line(line)
+        if error:
+            errors.append(error)
+            if len(errors) == 20:  # Limit to 20 errors
                 break
     
-    return errors[:20]  # Limit to 20 errors
+    return errors
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python check_build.py <project_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Run local build and capture errors")
+    parser.add_argument("project_path", help="Project directory to build")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Kill the build as soon as a critical error is printed")
+    parser.add_argument("--timeout", type=float, default=BUILD_TIMEOUT,
+                        help=f"Build timeout in seconds (default: {BUILD_TIMEOUT})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always build, ignoring cached verdicts for unchanged sources")
+    parser.add_argument("--trace", type=Path,
+                        help="Write a Chrome trace (chrome://tracing, Perfetto) of build phases "
+                             "and resources")
+    parser.add_argument("--record", action="store_true",
+                        help="Store the run in the build history (see build_history.py)")
+    parser.add_argument("--preflight", action="store_true",
+                        help="Run incremental tsc -b and lint in parallel first; build only if "
+                             "both are clean")
+    parser.add_argument("--preflight-only", action="store_true",
+                        help="Run the preflight checks without the full build "
+                             "(fast pre-push check)")
+    parser.add_argument("--bundle", action="store_true",
+                        help="After a successful build, analyze dist/ sizes and enforce "
+                             "bundle-budgets.json")
+    parser.add_argument("--all", action="store_true",
+                        help="Build every project found under project_path concurrently")
+    parser.add_argument("--jobs", type=int,
+                        help="Concurrent builds with --all (default: limited by CPUs and memory)")
+    parser.add_argument("--build-memory-mb", type=int, default=1536,
+                        help="Memory to reserve per concurrent build with --all (default: 1536)")
     
-    project_path = Path(sys.argv[1])
+    args = parser.parse_args()
+    project_path = Path(args.project_path)
     
     if not project_path.exists():
         print(json.dumps({"success": False, "message": f"Path not found: {project_path}"}))
         sys.exit(1)
     
-    result = run_build(project_path)
+    if args.all:
+        summary = check_all(project_path, args.jobs, args.build_memory_mb,
+                            args.fail_fast, args.timeout, not args.no_cache,
+                            args.trace, args.record, args.preflight, args.preflight_only,
+                            args.bundle)
+        sys.exit(0 if summary["success"] else 1)
+    
+    result = run_build(project_path, args.fail_fast, args.timeout, not args.no_cache,
+                       args.preflight, args.preflight_only, args.trace is not None)
+    if args.bundle:
+        check_bundle(project_path, result)
+    if args.trace:
+        write_trace(args.trace, {str(project_path): result})
+    if args.record and not result.get("cached"):
+        record_build(result, project_path)
     print(json.dumps(result, indent=2))
     
     sys.exit(0 if result["success"] else 1)
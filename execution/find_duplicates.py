@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+find_duplicates.py - Find duplicate files (e.g. images copied between asset folders)
+
+Usage:
+    python find_duplicates.py [path ...] [--min-size BYTES] [--workers N]
+
+With no paths, checks Images/ and website/public/images/ in this repo.
+Files are compared in stages so that most are never read in full:
+    1. group by size - a file with a unique size has no duplicate
+    2. hash the first and last BLOCK_SIZE bytes of each same-size file
+    3. fully hash (blake2b) only files whose size and edge hashes match
+Stages 2 and 3 run on a thread pool. Hard links to one file count once,
+since removing one of them reclaims nothing.
+
+Returns:
+    JSON with duplicate sets (largest savings first) and reclaimable bytes
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from scan_codebase import SKIP_DIRS
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATHS = [REPO_ROOT / "Images", REPO_ROOT / "website" / "public" / "images"]
+
+BLOCK_SIZE = 64 * 1024
+READ_SIZE = 1024 * 1024
+DIGEST_SIZE = 32
+MAX_WORKERS = 16
+
+
+def collect_files(roots: list, min_size: int) -> dict:
+    """Map size -> [path] for regular files under roots, one path per inode."""
+    by_size = defaultdict(list)
+    seen = set()
+    stack = [str(root) for root in roots]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue  # Symlinks, sockets, ...
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if st.st_size < min_size or (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            by_size[st.st_size].append(entry.path)
+    return by_size
+
+
+def edge_hash(path: str, size: int) -> tuple:
+    """Return (path, digest of the first and last BLOCK_SIZE bytes, bytes read).
+
+    Files no larger than two blocks are read whole, so their edge hash is
+    already a full hash.
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    try:
+        with open(path, "rb") as f:
+            if size <= 2 * BLOCK_SIZE:
+                data = f.read()
+                digest.update(data)
+                return path, digest.hexdigest(), len(data)
+            digest.update(f.read(BLOCK_SIZE))
+            f.seek(-BLOCK_SIZE, os.SEEK_END)
+            digest.update(f.read(BLOCK_SIZE))
+    except OSError:
+        return path, None, 0
+    return path, digest.hexdigest(), 2 * BLOCK_SIZE
+
+
+def full_hash(path: str) -> tuple:
+    """Return (path, blake2b digest of the whole file, bytes read)."""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    read = 0
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                read += len(chunk)
+    except OSError:
+        return path, None, 0
+    return path, digest.hexdigest(), read
+
+
+def regroup(pool: ThreadPoolExecutor, groups: list, hasher, stats: dict) -> list:
+    """Split each group of paths by hasher's digest, keeping groups of 2+."""
+    jobs = [(key, path) for key, paths in groups for path in paths]
+    hashed = pool.map(lambda job: (job[0], hasher(job)), jobs)
+    split = defaultdict(list)
+    for key, (path, digest, read) in hashed:
+        stats["bytes_read"] += read
+        if digest is not None:
+            split[(key, digest)].append(path)
+    return [(key, sorted(paths)) for key, paths in split.items() if len(paths) > 1]
+
+
+def find_duplicates(roots: list, min_size: int = 1, workers: int = None) -> dict:
+    """Find sets of identical files under roots."""
+    started = time.monotonic()
+    by_size = collect_files(roots, min_size)
+    candidates = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+    stats = {
+        "files": sum(len(paths) for paths in by_size.values()),
+        "bytes": sum(size * len(paths) for size, paths in by_size.items()),
+        "size_candidates": sum(len(paths) for _, paths in candidates),
+        "fully_hashed": 0,
+        "bytes_read": 0,
+    }
+
+    workers = workers or min(MAX_WORKERS, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        edges = regroup(pool, candidates, lambda job: edge_hash(job[1], job[0]), stats)
+
+        # Small files were read whole by edge_hash; only larger ones need stage 3
+        confirmed = [((size, digest), paths)
+                     for (size, digest), paths in edges if size <= 2 * BLOCK_SIZE]
+        large = [((size, None), paths) for (size, _), paths in edges if size > 2 * BLOCK_SIZE]
+        stats["fully_hashed"] = sum(len(paths) for _, paths in large)
+        full = regroup(pool, large, lambda job: full_hash(job[1]), stats)
+        confirmed += [((size, digest), paths) for ((size, _), digest), paths in full]
+
+    duplicate_sets = []
+    for (size, digest), paths in confirmed:
+        duplicate_sets.append({
+            "size": size,
+            "hash": digest,
+            "count": len(paths),
+            "reclaimable_bytes": size * (len(paths) - 1),
+            "files": [display_path(path) for path in paths],
+        })
+    duplicate_sets.sort(key=lambda s: (-s["reclaimable_bytes"], s["files"][0]))
+
+    stats["duration_seconds"] = round(time.monotonic() - started, 3)
+    return {
+        "roots": [display_path(str(root)) for root in roots],
+        "duplicate_sets": duplicate_sets,
+        "duplicate_files": sum(s["count"] - 1 for s in duplicate_sets),
+        "reclaimable_bytes": sum(s["reclaimable_bytes"] for s in duplicate_sets),
+        "stats": stats,
+    }
+
+
+def display_path(path: str) -> str:
+    """Paths inside the repo relative to it, others as given."""
+    try:
+        return Path(path).resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find duplicate files across asset folders")
+    parser.add_argument("paths", nargs="*",
+                        help="Directories to check (default: Images/ and website/public/images/)")
+    parser.add_argument("--min-size", type=int, default=1,
+                        help="Ignore files smaller than this many bytes (default: 1)")
+    parser.add_argument("--workers", type=int,
+                        help=f"Hashing threads (default: up to {MAX_WORKERS})")
+
+    args = parser.parse_args()
+    roots = [Path(path) for path in args.paths] or [path for path in DEFAULT_PATHS if path.is_dir()]
+
+    missing = [str(root) for root in roots if not root.is_dir()]
+    if missing or not roots:
+        not_found = ", ".join(missing) or "no default asset folders"
+        print(json.dumps({"error": f"Directory not found: {not_found}"}))
+        sys.exit(1)
+
+    print(json.dumps(find_duplicates(roots, max(args.min_size, 0), args.workers), indent=2))
+
+
+if __name__ == "__main__":
+    main()
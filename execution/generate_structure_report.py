@@ -11,6 +11,9 @@ Generates a comprehensive markdown report including:
 - Technology stack
 - Entry points
 - Dependency summary
+
+If scan_daemon.py is watching the project, scan data comes from the daemon
+instead of a fresh walk.
 """
 
 import sys
@@ -22,6 +25,7 @@ from datetime import datetime
 # Import scan functions from scan_codebase
 try:
     from scan_codebase import detect_project_type, find_entry_points, count_files_by_extension, get_dependencies
+    from scan_codebase import query_daemon
 except ImportError:
     # Fallback if run standalone
     import subprocess
@@ -39,10 +43,17 @@ def generate_report(path: Path) -> str:
     
     # Get scan data
     try:
-        project_types = detect_project_type(path)
-        entry_points = find_entry_points(path)
-        file_counts = count_files_by_extension(path, 4)
-        dependencies = get_dependencies(path)
+        data = query_daemon(path, {"cmd": "scan", "depth": 4, "structure": False})
+        if data:
+            project_types = data["project_types"]
+            entry_points = data["entry_points"]
+            file_counts = data["file_counts"]
+            dependencies = data["dependencies"]
+        else:
+            project_types = detect_project_type(path)
+            entry_points = find_entry_points(path)
+            file_counts = count_files_by_extension(path, 4)
+            dependencies = get_dependencies(path)
     except NameError:
         data = run_scanner(path)
         project_types = data.get("project_types", ["unknown"])
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+gitignore_rules.py - .gitignore matching for the codebase walkers
+
+Used by scan_codebase.py. Each .gitignore is compiled into one regex per
+rule plus combined regexes (one over names, one over paths) that reject
+entries no rule can match in a single call, so most entries cost a
+couple of regex matches per .gitignore above them. Supported syntax
+follows gitignore(5):
+    - comments, blank lines, escaped "\\#", "\\!" and trailing spaces
+    - "!" negation (the last matching rule wins; deeper files win over
+      shallower ones)
+    - anchored patterns (a "/" at the start or middle), directory-only
+      patterns (a trailing "/")
+    - "*", "?", "[...]" and "**" in leading "**/", trailing "/**" and
+      "/**/" positions
+
+IgnoreMatcher also applies the .gitignore files between the repository
+root and the scan root, and .git/info/exclude. Walkers prune ignored
+directories before descending, so, as in git, a file inside an ignored
+directory can't be re-included.
+"""
+
+import os
+import re
+from pathlib import Path
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate one gitignore glob (without "!" or a trailing "/") to a regex."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == "*":
+            at_segment_start = i == 0 or pattern[i - 1] == "/"
+            if at_segment_start and pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if at_segment_start and pattern.startswith("**", i) and i + 2 == n:
+                out.append(".*")
+                i += 2
+                continue
+            # Any other run of stars is a plain "*"
+            while i < n and pattern[i] == "*":
+                i += 1
+            out.append("[^/]*")
+            continue
+        if char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            start = i + 1
+            negate = pattern[start:start + 1] in ("!", "^")
+            if negate:
+                start += 1
+            # A "]" right after the opening bracket is literal
+            end = pattern.find("]", start + 1 if pattern[start:start + 1] == "]" else start)
+            if end < 0:
+                out.append(re.escape(char))
+            else:
+                body = pattern[start:end].replace("\\", "\\\\").replace("[", "\\[")
+                out.append(f"[{'^' if negate else ''}{body}]")
+                i = end
+        elif char == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
+
+
+def combine(regexes: list):
+    return re.compile("|".join(f"(?:{regex})" for regex in regexes), re.DOTALL) if regexes else None
+
+
+class GitignoreRules:
+    """The compiled rules of one .gitignore (or info/exclude) file."""
+
+    def __init__(self, text: str):
+        # (regex, negate, dir_only, on_name)
+        self.rules = []
+        name_regexes, path_regexes = [], []
+        for line in text.splitlines():
+            if not line or line.startswith("#"):
+                continue
+            stripped = line.rstrip(" ")
+            # "\ " keeps one trailing space
+            if stripped.endswith("\\") and len(stripped) < len(line):
+                stripped += " "
+            line = stripped
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # Patterns without a "/" match the name at any depth; walkers
+            # prune ignored parents, so matching the entry's own name is enough
+            on_name = "/" not in line
+            regex = glob_to_regex(line[1:] if line.startswith("/") else line)
+            self.rules.append((re.compile(regex, re.DOTALL), negate, dir_only, on_name))
+            (name_regexes if on_name else path_regexes).append(regex)
+        self.any_name = combine(name_regexes)
+        self.any_path = combine(path_regexes)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def match(self, path: str, name: str, is_dir: bool):
+        """True if path (relative to the file's directory, ending in name) is
+        ignored, False if re-included, None if no rule matches."""
+        if not ((self.any_name is not None and self.any_name.fullmatch(name))
+                or (self.any_path is not None and self.any_path.fullmatch(path))):
+            return None
+        for regex, negate, dir_only, on_name in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(name if on_name else path):
+                return not negate
+        return None
+
+
+def read_rules(path) -> GitignoreRules:
+    """Compile a .gitignore file; None if it is missing, unreadable or empty."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+            rules = GitignoreRules(f.read())
+    except OSError:
+        return None
+    return rules or None
+
+
+class IgnoreMatcher:
+    """The .gitignore rules that apply below one scan root.
+
+    Rules inside the root are added with add() as the walk lists each
+    directory, so parents always have their rules before their children
+    are checked.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        # rel dir ("" or "dir/sub/") -> GitignoreRules, for dirs inside the root
+        self.rules = {}
+        # (root's path relative to the rules' directory, rules), nearest first
+        self.outer = []
+        # rel dir -> [(chars of rel to drop, prefix to add, rules)] that apply to its entries
+        self.chains = {}
+        for parent in [self.root, *self.root.parents]:
+            if (parent / ".git").exists():
+                self._load_outer(parent)
+                break
+
+    def _load_outer(self, repo: Path) -> None:
+        prefix = self.root.relative_to(repo).as_posix()
+        prefix = "" if prefix == "." else f"{prefix}/"
+        outer = []
+        exclude = read_rules(repo / ".git" / "info" / "exclude")
+        if exclude:
+            outer.append((prefix, exclude))
+        directory = repo
+        for part in prefix.split("/")[:-1]:
+            rules = read_rules(directory / ".gitignore")
+            if rules:
+                outer.append((prefix, rules))
+            directory = directory / part
+            prefix = prefix[len(part) + 1:]
+        self.outer = outer[::-1]
+
+    def read(self, dir_path: str, entries: list) -> GitignoreRules:
+        """Compile dir_path's .gitignore if the listing has one (safe to call
+        from worker threads)."""
+        for name, is_dir, _, _ in entries:
+            if name == ".gitignore" and not is_dir:
+                return read_rules(os.path.join(dir_path, name))
+        return None
+
+    def add(self, rel: str, rules: GitignoreRules) -> None:
+        self.rules[rel] = rules
+        self.chains.pop(rel, None)
+
+    def _chain(self, rel: str) -> list:
+        chain = []
+        directory = rel
+        while True:
+            rules = self.rules.get(directory)
+            if rules is not None:
+                chain.append((len(directory), "", rules))
+            if not directory:
+                break
+            directory = directory[:directory.rstrip("/").rfind("/") + 1]
+        chain.extend((0, prefix, rules) for prefix, rules in self.outer)
+        return chain
+
+    def ignored(self, rel: str, name: str, is_dir: bool) -> bool:
+        """Whether entry name in directory rel is ignored."""
+        chain = self.chains.get(rel)
+        if chain is None:
+            chain = self.chains[rel] = self._chain(rel)
+        if not chain:
+            return False
+        path = f"{rel}{name}"
+        for drop, prefix, rules in chain:
+            matched = rules.match(f"{prefix}{path[drop:]}", name, is_dir)
+            if matched is not None:
+                return matched
+        return False
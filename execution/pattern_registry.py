@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+pattern_registry.py - Load, validate and cache error-pattern packs
+
+Usage:
+    python pattern_registry.py [--packs core,vite] [--refresh]
+
+Pattern packs live in execution/patterns/ as JSON (or YAML when PyYAML is
+installed). Each pack contributes:
+    - error_patterns: regex patterns used by analyze_vercel_logs.py
+    - build_errors:   line markers used by check_build.parse_errors
+
+Packs load in ascending "order", so the core pack always comes first.
+Callers load DEFAULT_PACKS (just core, the original built-in patterns) unless
+they name packs; "all" selects every pack in the directory. Every pack file
+is validated either way. This script lists all packs unless --packs is given.
+
+Validated, merged packs are cached in .tmp/pattern_registry/, one file per
+pack selection, and only re-read when a pack file changes. The cache saves
+reading, parsing and validating the packs; callers still compile their
+regexes on each start.
+
+Returns:
+    JSON with the loaded packs, pattern counts and patterns at risk of
+    catastrophic backtracking
+"""
+
+import sys
+import json
+import re
+import argparse
+from pathlib import Path
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from cache_files import keyed_file, write_json
+
+
+PACKS_DIR = Path(__file__).resolve().parent / "patterns"
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".tmp" / "pattern_registry"
+CACHE_VERSION = 1
+
+# Packs loaded when none are named; the others (nextjs, vite, python,
+# docker) are opt-in so default findings match the original patterns
+DEFAULT_PACKS = ["core"]
+ALL_PACKS = "all"
+
+SEVERITIES = {"critical", "high", "medium", "low"}
+PACK_SUFFIXES = {".json", ".yaml", ".yml"}
+
+
+def find_pack_files(packs_dir: Path = PACKS_DIR) -> list:
+    """List pack files in the packs directory."""
+    if not packs_dir.is_dir():
+        return []
+    return sorted(p for p in packs_dir.iterdir() if p.suffix.lower() in PACK_SUFFIXES)
+
+
+def read_pack(pack_file: Path) -> dict:
+    """Read a single pack file (JSON, or YAML if PyYAML is available)."""
+    text = pack_file.read_text(encoding="utf-8")
+    if pack_file.suffix.lower() == ".json":
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError(f"{pack_file.name}: PyYAML is required for YAML packs (pip install pyyaml)")
+    return yaml.safe_load(text)
+
+
+def validate_pack(pack: dict, source: str) -> None:
+    """Raise ValueError describing the first problem found in a pack."""
+    if not isinstance(pack, dict):
+        raise ValueError(f"{source}: pack must be a mapping")
+    if not isinstance(pack.get("name"), str) or not pack["name"]:
+        raise ValueError(f"{source}: missing pack name")
+
+    for error_type, config in pack.get("error_patterns", {}).items():
+        where = f"{source}: error_patterns.{error_type}"
+        if not isinstance(config, dict):
+            raise ValueError(f"{where} must be a mapping")
+        patterns = config.get("patterns")
+        if not isinstance(patterns, list) or not patterns:
+            raise ValueError(f"{where}.patterns must be a non-empty list")
+        for pattern in patterns:
+            try:
+                re.compile(pattern, re.IGNORECASE)
+            except (re.error, TypeError) as e:
+                raise ValueError(f"{where}: invalid pattern {pattern!r}: {e}")
+        if not isinstance(config.get("category"), str):
+            raise ValueError(f"{where}.category must be a string")
+        if config.get("severity") not in SEVERITIES:
+            raise ValueError(f"{where}.severity must be one of {sorted(SEVERITIES)}")
+        if not isinstance(config.get("fixes", []), list):
+            raise ValueError(f"{where}.fixes must be a list")
+
+    for i, entry in enumerate(pack.get("build_errors", [])):
+        where = f"{source}: build_errors[{i}]"
+        for key in ("type", "match", "description"):
+            if not isinstance(entry.get(key), str) or not entry[key]:
+                raise ValueError(f"{where}.{key} must be a non-empty string")
+        if entry.get("regex"):
+            try:
+                re.compile(entry["match"])
+            except re.error as e:
+                raise ValueError(f"{where}: invalid regex {entry['match']!r}: {e}")
+
+
+def merge_packs(packs: list) -> dict:
+    """Merge validated packs, in load order, into one registry."""
+    error_patterns = {}
+    build_errors = []
+    for pack in packs:
+        for error_type, config in pack.get("error_patterns", {}).items():
+            if error_type in error_patterns:
+                raise ValueError(f"{pack['name']}: error type '{error_type}' is already defined by another pack")
+            error_patterns[error_type] = {
+                "patterns": list(config["patterns"]),
+                "category": config["category"],
+                "severity": config["severity"],
+                "fixes": list(config.get("fixes", [])),
+            }
+        build_errors.extend(
+            {
+                "type": entry["type"],
+                "match": entry["match"],
+                "description": entry["description"],
+                "regex": bool(entry.get("regex", False)),
+            }
+            for entry in pack.get("build_errors", [])
+        )
+    return {
+        "packs": [pack["name"] for pack in packs],
+        "error_patterns": error_patterns,
+        "build_errors": build_errors,
+    }
+
+
+def pack_signature(pack_files: list) -> list:
+    """Identify the current pack files by name, mtime and size."""
+    signature = []
+    for pack_file in pack_files:
+        st = pack_file.stat()
+        signature.append([pack_file.name, st.st_mtime_ns, st.st_size])
+    return signature
+
+
+def cache_file_for(packs_dir: Path, selection: list, cache_dir: Path = CACHE_DIR) -> Path:
+    """Cache file for one packs directory and pack selection (None for all packs)."""
+    return keyed_file(cache_dir, json.dumps([str(packs_dir), selection]))
+
+
+def load_registry(packs: list = None, packs_dir: Path = PACKS_DIR,
+                  cache_dir: Path = CACHE_DIR, refresh: bool = False) -> dict:
+    """Load the pattern registry from the named packs (default: DEFAULT_PACKS).
+
+    Pass ["all"] to load every pack. Returns a dict with "packs", "error_patterns" (same shape as the former
+    ERROR_PATTERNS) and "build_errors". Raises ValueError for invalid packs
+    or unknown pack names.
+    """
+    pack_files = find_pack_files(packs_dir)
+    signature = pack_signature(pack_files)
+    packs = packs or DEFAULT_PACKS
+    if ALL_PACKS in packs:
+        packs = None
+    selection = sorted(set(packs)) if packs else None
+    cache_file = cache_file_for(packs_dir, selection, cache_dir)
+
+    if not refresh and cache_file.exists():
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            if (cached.get("version") == CACHE_VERSION
+                    and cached.get("packs_dir") == str(packs_dir)
+                    and cached.get("signature") == signature
+                    and cached.get("selection") == selection):
+                return cached["registry"]
+        except (json.JSONDecodeError, OSError, KeyError):
+            pass
+
+    loaded = []
+    for pack_file in pack_files:
+        try:
+            pack = read_pack(pack_file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{pack_file.name}: invalid JSON: {e}")
+        validate_pack(pack, pack_file.name)
+        loaded.append(pack)
+
+    if packs:
+        names = {pack["name"] for pack in loaded}
+        unknown = sorted(set(packs) - names)
+        if unknown:
+            raise ValueError(f"Unknown pattern pack(s): {', '.join(unknown)}")
+        loaded = [pack for pack in loaded if pack["name"] in packs]
+
+    loaded.sort(key=lambda pack: (pack.get("order", 100), pack["name"]))
+    registry = merge_packs(loaded)
+
+    # Best-effort: a read-only tree still works, just without the cache
+    write_json(cache_file, {
+        "version": CACHE_VERSION,
+        "packs_dir": str(packs_dir),
+        "signature": signature,
+        "selection": selection,
+        "registry": registry,
+    })
+
+    return registry
+
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+
+_BROAD_CATEGORIES = {
+    sre_parse.CATEGORY_NOT_SPACE,
+    sre_parse.CATEGORY_NOT_DIGIT,
+    sre_parse.CATEGORY_NOT_WORD,
+}
+
+
+def _is_broad(op, value) -> bool:
+    """True for items that match almost any character (., \\S, [^x], ...)."""
+    if op in (sre_parse.ANY, sre_parse.NOT_LITERAL):
+        return True
+    if op is sre_parse.CATEGORY:
+        return value in _BROAD_CATEGORIES
+    if op is sre_parse.IN:
+        return any(
+            item_op is sre_parse.NEGATE or (item_op is sre_parse.CATEGORY and item in _BROAD_CATEGORIES)
+            for item_op, item in value
+        )
+    return False
+
+
+def _is_unbounded(op, value) -> bool:
+    return op in _REPEATS and value[1] == sre_parse.MAXREPEAT
+
+
+def _is_broad_repeat(op, value) -> bool:
+    if not _is_unbounded(op, value):
+        return False
+    sub_items = list(value[2])
+    return len(sub_items) == 1 and _is_broad(*sub_items[0])
+
+
+def _children(op, value) -> list:
+    """Sub-sequences of a parsed regex item."""
+    if op in _REPEATS:
+        return [value[2]]
+    if op is sre_parse.SUBPATTERN:
+        return [value[-1]]
+    if op is sre_parse.BRANCH:
+        return list(value[1])
+    if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return [value[1]]
+    return []
+
+
+def backtracking_risk(pattern: str) -> dict:
+    """Statically flag regex shapes that backtrack badly on adversarial lines.
+
+    - exponential: a repeated group that itself contains a repeat, e.g. (a+)+
+    - quadratic: an unbounded wildcard followed by more required text, e.g.
+      "Type '.*' is not assignable". re.search retries it from every start
+      position and each try scans to the end of the line, so a long line
+      with many partial matches costs O(n^2).
+    """
+    reasons = []
+    level = None
+
+    def walk(items, inside_repeat):
+        nonlocal level
+        items = list(items)
+        for i, (op, value) in enumerate(items):
+            if op in _REPEATS:
+                high, sub = value[1], value[2]
+                if inside_repeat and high > 1:
+                    reasons.append("nested quantifier")
+                    level = "exponential"
+                following = items[i + 1:]
+                if _is_broad_repeat(op, value) and following:
+                    reasons.append("unbounded wildcard followed by required text")
+                    level = level or "quadratic"
+                if _is_unbounded(op, value) and following and _is_unbounded(*following[0]) \
+                        and (_is_broad_repeat(op, value) or _is_broad_repeat(*following[0])):
+                    reasons.append("adjacent unbounded quantifiers")
+                    level = level or "quadratic"
+                walk(sub, inside_repeat or high > 1)
+            else:
+                for child in _children(op, value):
+                    walk(child, inside_repeat)
+
+    walk(sre_parse.parse(pattern, re.IGNORECASE), False)
+    return {"risk": level, "reasons": sorted(set(reasons))}
+
+
+def literal_runs(pattern: str) -> list:
+    """Top-level runs of literal text in a pattern, in order."""
+    runs, current = [], []
+    for op, value in sre_parse.parse(pattern, re.IGNORECASE):
+        if op is sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return runs
+
+
+def adversarial_line(pattern: str, repeats: int) -> str:
+    """Build a line that keeps almost matching ``pattern``.
+
+    Repeats the pattern's leading literals without the final one, so every
+    repetition starts a partial match that must be abandoned after scanning
+    the rest of the line.
+    """
+    runs = literal_runs(pattern)
+    seed = "".join(runs[:-1]) if len(runs) > 1 else (runs[0][:-1] if runs else "") or "a"
+    return (seed + " ") * repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and list error-pattern packs")
+    parser.add_argument("--packs", default=ALL_PACKS,
+                        help="Comma-separated pack names (default: all)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached registry")
+
+    args = parser.parse_args()
+    packs = [p.strip() for p in args.packs.split(",") if p.strip()]
+
+    try:
+        registry = load_registry(packs, refresh=args.refresh)
+    except ValueError as e:
+        print(json.dumps({"valid": False, "error": str(e)}))
+        sys.exit(1)
+
+    risky = []
+    for error_type, config in registry["error_patterns"].items():
+        for pattern in config["patterns"]:
+            risk = backtracking_risk(pattern)
+            if risk["risk"]:
+                risky.append({"type": error_type, "pattern": pattern, **risk})
+
+    print(json.dumps({
+        "valid": True,
+        "packs": registry["packs"],
+        "error_types": len(registry["error_patterns"]),
+        "patterns": sum(len(c["patterns"]) for c in registry["error_patterns"].values()),
+        "build_errors": len(registry["build_errors"]),
+        "backtracking_risks": risky,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
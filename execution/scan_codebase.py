@@ -3,19 +3,62 @@
 scan_codebase.py - Scan a codebase and output structured information
 
 Usage:
-    python scan_codebase.py <project_path> [--depth N] [--json]
+    python scan_codebase.py <project_path> [--depth N] [--json | --ndjson] [--refresh | --no-index] [--no-daemon]
+        [--no-gitignore | --git-files]
+    python scan_codebase.py <project_path> --query counts|largest|entry-points [--limit N]
+
+The tree is walked once with os.scandir, one directory level at a time,
+with each level's directories listed concurrently on a thread pool. The
+same pass builds the structure tree, the extension counts and the entry
+points. The structure is kept as a columnar FileTable (a few bytes per
+entry) and only turned into JSON while it is written.
+
+Besides SKIP_DIRS, entries matched by the project's .gitignore files
+(nested ones, negation and anchored patterns included, see
+gitignore_rules.py) are left out and ignored directories are never
+entered; --no-gitignore turns this off. --git-files takes the file list
+from `git ls-files` instead of walking the tree.
+
+Directory listings are kept in an on-disk index (.tmp/scan_index/). Later
+scans stat each directory and only re-list those whose mtime changed, so
+repeat scans of big repos are near-instant. Directories modified within
+RACY_SECONDS of being listed are always re-listed, since a same-tick change
+would not move their mtime. Editing a file in place doesn't change its
+directory's mtime either, so when sizes are needed the files of a reused
+listing are still stat'ed; only the directory read is skipped. --refresh
+rebuilds the index.
+--query answers from the index alone, without touching the filesystem.
+
+When scan_daemon.py is watching the project, scans are answered by the
+daemon over its Unix socket in milliseconds (--no-daemon scans directly).
+
+--ndjson streams the structure instead of building it in memory: a "scan"
+header line, one record per directory/file as the walk reaches it, and a
+closing "summary" line with entry points and extension counts.
 
 Returns:
-    JSON or text with codebase structure and metadata
+    JSON (or NDJSON) with codebase structure and metadata
 """
 
 import sys
 import json
 import os
+import stat
+import time
+import heapq
+import socket
+import hashlib
+import subprocess
+from array import array
+from json.encoder import encode_basestring_ascii as encode_string
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import argparse
 
+from cache_files import keyed_file, write_json
+from gitignore_rules import IgnoreMatcher
+
 
 # Directories to skip
 SKIP_DIRS = {
@@ -42,43 +85,523 @@ PROJECT_INDICATORS = {
 }
 
 
-def scan_directory(path: Path, max_depth: int = 5, current_depth: int = 0) -> dict:
-    """Recursively scan a directory and build structure."""
+# Dotfiles still shown in the structure tree
+VISIBLE_DOTFILES = {".env.example", ".gitignore"}
+
+# Entry point candidates, relative to the project root
+ENTRY_PATTERNS = [
+    "index.html", "index.js", "index.ts", "index.tsx",
+    "main.js", "main.ts", "main.py",
+    "app.js", "app.ts", "app.tsx", "app.py",
+    "server.js", "server.ts", "server.py",
+    "src/index.js", "src/index.ts", "src/index.tsx",
+    "src/main.js", "src/main.ts",
+    "src/App.tsx", "src/App.js",
+    "pages/index.tsx", "pages/index.js",
+    "app/page.tsx", "app/page.js",
+]
+
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Directories listed at a time when streaming (see scan_tree's emit)
+STREAM_BATCH = 256
+
+
+def file_suffix(name: str) -> str:
+    """Same as Path(name).suffix, without building a Path."""
+    i = name.rfind(".")
+    return name[i:] if 0 < i < len(name) - 1 else ""
+
+
+def list_directory(path: str, with_sizes: bool) -> tuple:
+    """List a directory as sorted (name, is_dir, is_symlink, size) tuples.
+
+    Directories sort first, then names case-insensitively. Returns
+    (entries, error) where error is set if the directory can't be read.
+    """
+    entries = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                size = None
+                if with_sizes and not is_dir:
+                    try:
+                        size = entry.stat().st_size
+                    except OSError:
+                        # Broken symlink: report the link itself
+                        size = entry.stat(follow_symlinks=False).st_size
+                entries.append((entry.name, is_dir, entry.is_symlink(), size))
+    except PermissionError:
+        return [], "Permission denied"
+    except OSError as e:
+        return [], str(e)
+    entries.sort(key=lambda e: (not e[1], e[0].lower()))
+    return entries, None
+
+
+def git_file_lister(path: Path):
+    """A scan_tree lister over `git ls-files` instead of the filesystem walk.
+
+    Lists tracked files plus untracked files that aren't ignored, so git
+    applies every exclude rule (including core.excludesFile). Returns None
+    outside a git checkout or when git isn't installed.
+    """
+    try:
+        listed = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=path, capture_output=True, timeout=120,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if listed.returncode != 0:
+        return None
     
-    if current_depth > max_depth:
-        return {"truncated": True}
+    # rel dir -> {name: is_dir}
+    tree = defaultdict(dict)
+    for file in listed.stdout.split(b"\0"):
+        if not file:
+            continue
+        parts = os.fsdecode(file).split("/")
+        rel = ""
+        for part in parts[:-1]:
+            tree[rel][part] = True
+            rel += f"{part}/"
+        tree[rel].setdefault(parts[-1], False)
     
-    result = {
-        "name": path.name,
-        "type": "directory",
-        "children": []
-    }
+    def lister(dir_path: str, rel: str, with_sizes: bool) -> tuple:
+        entries = []
+        for name, is_dir in tree.get(rel, {}).items():
+            full_path = os.path.join(dir_path, name)
+            try:
+                st = os.lstat(full_path)
+            except OSError:
+                continue  # Tracked but deleted from the working tree
+            is_symlink = stat.S_ISLNK(st.st_mode)
+            size = None
+            if with_sizes and not is_dir:
+                try:
+                    size = os.stat(full_path).st_size if is_symlink else st.st_size
+                except OSError:
+                    size = st.st_size
+            entries.append((name, is_dir, is_symlink, size))
+        entries.sort(key=lambda e: (not e[1], e[0].lower()))
+        return entries, None
     
-    try:
-        entries = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-        
-        for entry in entries:
-            if entry.name.startswith(".") and entry.name not in {".env.example", ".gitignore"}:
+    return lister
+
+
+INDEX_DIR = Path(__file__).resolve().parent.parent / ".tmp" / "scan_index"
+INDEX_VERSION = 1
+
+# Listings this close to their directory's mtime may have missed a change
+RACY_SECONDS = 2
+
+
+class ScanIndex:
+    """Persistent per-directory listings, reused while a directory's mtime is unchanged."""
+
+    def __init__(self, root: Path, index_file: Path = None):
+        self.root = root.resolve()
+        self.index_file = index_file or keyed_file(INDEX_DIR, str(self.root))
+        self.dirs = {}
+        self.relisted = 0
+        self.reused = 0
+        self.resized = 0
+    
+    def identity(self) -> list:
+        """What the index is only valid for: this root directory and skip rules."""
+        st = os.stat(self.root)
+        return [INDEX_VERSION, str(self.root), st.st_dev, st.st_ino, sorted(SKIP_DIRS)]
+    
+    def load(self) -> bool:
+        """Load the index; returns False (leaving it empty) if missing or invalid."""
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("identity") != self.identity() or not isinstance(data.get("dirs"), dict):
+                return False
+            self.dirs = data["dirs"]
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    def save(self) -> None:
+        """Write the index atomically, dropping directories that no longer exist."""
+        live = {"": self.dirs[""]} if "" in self.dirs else {}
+        for rel in sorted(self.dirs, key=len):
+            if not rel:
                 continue
-            if entry.name in SKIP_DIRS:
+            parent, _, name = rel[:-1].rpartition("/")
+            parent = f"{parent}/" if parent else ""
+            if parent in live and any(e[0] == name and e[1] for e in live[parent][3]):
+                live[rel] = self.dirs[rel]
+        if not self.relisted and not self.resized and len(live) == len(self.dirs):
+            return  # Nothing changed since it was loaded
+        self.dirs = live
+        try:
+            identity = self.identity()
+        except OSError:
+            return
+        write_json(self.index_file, {"identity": identity, "dirs": live}, separators=(",", ":"))
+    
+    def lister(self, dir_path: str, rel: str, with_sizes: bool) -> tuple:
+        """list_directory, reusing the indexed listing when the directory is unchanged."""
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        cached = self.dirs.get(rel)
+        if cached and mtime is not None and cached[0] == mtime \
+                and mtime < cached[1] - RACY_SECONDS * 10 ** 9:
+            self.reused += 1
+            if with_sizes:
+                cached[3] = self._restat(dir_path, cached[3])
+            return cached[3], cached[2]
+        listed_at = time.time_ns()
+        entries, error = list_directory(dir_path, True)
+        self.dirs[rel] = [mtime, listed_at, error, entries]
+        self.relisted += 1
+        return entries, error
+    
+    def _restat(self, dir_path: str, entries: list) -> list:
+        """Refresh the sizes of a reused listing's files (edited in place)."""
+        fresh = []
+        for name, is_dir, is_symlink, size in entries:
+            if not is_dir:
+                path = os.path.join(dir_path, name)
+                try:
+                    current = os.stat(path).st_size
+                except OSError:
+                    try:
+                        current = os.lstat(path).st_size
+                    except OSError:
+                        current = size
+                if current != size:
+                    self.resized += 1
+                    size = current
+            fresh.append((name, is_dir, is_symlink, size))
+        return fresh
+    
+    def offline_lister(self, dir_path: str, rel: str, with_sizes: bool) -> tuple:
+        """Indexed listings only; never touches the filesystem."""
+        cached = self.dirs.get(rel)
+        if cached is None:
+            return [], "Not indexed"
+        return cached[3], cached[2]
+
+
+def daemon_socket_path(root: Path) -> Path:
+    """Unix socket a scan_daemon.py watching root listens on."""
+    key = hashlib.blake2b(str(root.resolve()).encode("utf-8"), digest_size=12).hexdigest()
+    return INDEX_DIR.parent / "scan_daemon" / f"{key}.sock"
+
+
+def query_daemon(root: Path, request: dict, timeout: float = 10.0) -> dict:
+    """Send one request to the scan daemon watching root.
+
+    Returns None when no daemon is running (or it doesn't answer), so
+    callers can fall back to scanning directly.
+    """
+    socket_path = daemon_socket_path(root)
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            chunks = []
+            while True:
+                chunk = sock.recv(1 << 20)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        response = json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+    return response if isinstance(response, dict) and "error" not in response else None
+
+
+class FileTable:
+    """Compact scan structure: one row per entry, stored in parallel arrays.
+
+    A dict per file costs a few hundred bytes; a row here costs about 17.
+    Each distinct name is stored once and rows refer to it by id. Parents are
+    row indexes and sizes sit in an array (-1 for unknown). Rows are added
+    in walk order, so a directory's children are contiguous and keep their
+    listing order. to_dict() and iter_json() give exactly the nested
+    structure scan_directory has always returned.
+    """
+    
+    DIRECTORY, FILE, TRUNCATED = 0, 1, 2
+    
+    def __init__(self, root_name: str):
+        self.name_ids = {}
+        self.names = []
+        self.name_index = array("I")
+        self.parents = array("i")
+        self.kinds = array("B")
+        self.sizes = array("q")
+        # row -> message, for the few directories that couldn't be read
+        self.errors = {}
+        self.add(-1, self.DIRECTORY, root_name)
+    
+    def __len__(self) -> int:
+        return len(self.kinds)
+    
+    def add(self, parent: int, kind: int, name: str = "", size: int = None) -> int:
+        """Append an entry under row parent and return its row."""
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        self.name_index.append(name_id)
+        self.parents.append(parent)
+        self.kinds.append(kind)
+        self.sizes.append(-1 if size is None else size)
+        return len(self.kinds) - 1
+    
+    def name(self, row: int) -> str:
+        return self.names[self.name_index[row]]
+    
+    def size(self, row: int):
+        size = self.sizes[row]
+        return None if size < 0 else size
+    
+    def child_ranges(self) -> dict:
+        """{directory row: (first child row, last child row + 1)}."""
+        ranges = {}
+        for row in range(1, len(self.parents)):
+            parent = self.parents[row]
+            if parent in ranges:
+                ranges[parent][1] = row + 1
+            else:
+                ranges[parent] = [row, row + 1]
+        return ranges
+    
+    def files(self):
+        """Yield (relative path, size) for every file in the structure."""
+        dir_paths = {0: ""}
+        for row in range(1, len(self.kinds)):
+            kind = self.kinds[row]
+            if kind == self.TRUNCATED:
                 continue
-            
-            if entry.is_dir():
-                child = scan_directory(entry, max_depth, current_depth + 1)
-                result["children"].append(child)
+            path = dir_paths[self.parents[row]] + self.name(row)
+            if kind == self.DIRECTORY:
+                dir_paths[row] = path + "/"
             else:
-                result["children"].append({
-                    "name": entry.name,
-                    "type": "file",
-                    "size": entry.stat().st_size,
-                    "extension": entry.suffix.lower()
-                })
-    except PermissionError:
-        result["error"] = "Permission denied"
+                yield path, self.size(row)
+    
+    def to_dict(self, row: int = 0, ranges: dict = None) -> dict:
+        if ranges is None:
+            ranges = self.child_ranges()
+        kind = self.kinds[row]
+        if kind == self.TRUNCATED:
+            return {"truncated": True}
+        name = self.name(row)
+        if kind == self.FILE:
+            return {"name": name, "type": "file", "size": self.size(row), "extension": file_suffix(name).lower()}
+        start, end = ranges.get(row, (0, 0))
+        node = {"name": name, "type": "directory",
+                "children": [self.to_dict(child, ranges) for child in range(start, end)]}
+        if row in self.errors:
+            node["error"] = self.errors[row]
+        return node
+    
+    def iter_json(self, indent: int = None, level: int = 0, row: int = 0, ranges: dict = None):
+        """Yield JSON text equal to json.dumps(self.to_dict(), indent=indent),
+        without building the dicts. level is the nesting depth of the table
+        inside a larger document."""
+        if ranges is None:
+            ranges = self.child_ranges()
+        if indent is None:
+            sep, opening, close = ", ", "{", "}"
+        else:
+            sep = ",\n" + " " * (indent * (level + 1))
+            opening, close = "{" + sep[1:], "\n" + " " * (indent * level) + "}"
+        kind = self.kinds[row]
+        if kind == self.TRUNCATED:
+            yield f'{opening}"truncated": true{close}'
+            return
+        name = self.name(row)
+        if kind == self.FILE:
+            size = self.sizes[row]
+            yield (f'{opening}"name": {encode_string(name)}{sep}"type": "file"{sep}'
+                   f'"size": {size if size >= 0 else "null"}{sep}'
+                   f'"extension": {encode_string(file_suffix(name).lower())}{close}')
+            return
+        
+        yield f'{opening}"name": {encode_string(name)}{sep}"type": "directory"{sep}"children": '
+        start, end = ranges.get(row, (0, 0))
+        if start == end:
+            yield "[]"
+        else:
+            if indent is None:
+                child_sep, child_close = ", ", "]"
+            else:
+                child_sep = ",\n" + " " * (indent * (level + 2))
+                child_close = sep[1:] + "]"
+            yield "[" + child_sep[2:] if indent is None else "[" + child_sep[1:]
+            for child in range(start, end):
+                if child > start:
+                    yield child_sep
+                yield from self.iter_json(indent, level + 2, child, ranges)
+            yield child_close
+        if row in self.errors:
+            yield f'{sep}"error": {encode_string(self.errors[row])}'
+        yield close
+
+
+def scan_tree(path: Path, max_depth: int = 5, structure: bool = True, workers: int = SCAN_WORKERS,
+              lister=None, offline: bool = False, largest: int = 0, emit=None,
+              gitignore: bool = True) -> dict:
+    """Walk the tree once, building structure (a FileTable), extension counts and entry points.
+
+    The structure follows scan_directory's rules (dotfiles other than
+    VISIBLE_DOTFILES and SKIP_DIRS names are hidden, symlinked directories are
+    followed, directories past max_depth are {"truncated": True}). Counts
+    follow count_files_by_extension's (every file in a directory at most
+    max_depth deep, skipping SKIP_DIRS, hidden and symlinked directories).
     
+    ``lister(dir_path, rel, with_sizes)`` replaces list_directory (e.g. a
+    ScanIndex). With ``offline``, entry points are only taken from listings.
+    ``largest`` also collects the N largest counted files. With ``gitignore``,
+    entries ignored by the project's .gitignore files are neither shown nor
+    counted, and ignored directories are never listed.
+    
+    With ``emit``, structure entries are passed to ``emit(record)`` as they
+    are listed instead of being kept in a tree ("structure" is then None):
+    {"type": "directory" | "file" | "truncated" | "error", "path": ...},
+    files with "size" and "extension", errors with "error". Parents are
+    always emitted before their children. Directories are listed
+    STREAM_BATCH at a time, so only one batch of listings and the queue of
+    directories still to visit are held, never the whole tree.
+    """
+    if lister is None:
+        lister = lambda dir_path, rel, with_sizes: list_directory(dir_path, with_sizes)
+    matcher = IgnoreMatcher(path) if gitignore else None
+    
+    def list_dir(item):
+        dir_path, rel, node, counted = item
+        entries, error = lister(dir_path, rel, node is not None or largest > 0)
+        # .gitignore files are read with the listing, on the worker thread
+        rules = matcher.read(dir_path, entries) if matcher is not None and not error else None
+        return entries, error, rules
+    
+    table = None
+    if emit is not None:
+        # Shown directories are marked True; nothing is kept per entry
+        root = True
+    elif structure:
+        table = FileTable(path.name)
+        root = 0
+    else:
+        root = None
+    counts = defaultdict(int)
+    top_files = []
+    # {name: is_symlink} listed at the root and its immediate subdirectories,
+    # for entry points
+    listings = {}
+    
+    # (directory path, relative path, structure row / True or None, counted)
+    level = [(str(path), "", root, True)]
+    depth = 0
+    # Without emit a whole level is listed at once
+    batch_size = STREAM_BATCH if emit is not None else None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            next_level = []
+            for start in range(0, len(level), batch_size or len(level)):
+                batch = level[start:start + batch_size] if batch_size else level
+                listed = pool.map(list_dir, batch)
+                for (dir_path, rel, node, counted), (entries, error, rules) in zip(batch, listed):
+                    if error:
+                        if emit is not None and node is not None:
+                            emit({"type": "error", "path": rel.rstrip("/") or ".", "error": error})
+                        elif node is not None:
+                            table.errors[node] = error
+                        continue
+                    if depth <= 1:
+                        listings[rel] = {entry[0]: entry[2] for entry in entries}
+                    if rules:
+                        matcher.add(rel, rules)
+                    
+                    for name, is_dir, is_symlink, size in entries:
+                        if matcher is not None and matcher.ignored(rel, name, is_dir):
+                            continue
+                        shown = node is not None and name not in SKIP_DIRS \
+                            and not (name.startswith(".") and name not in VISIBLE_DOTFILES)
+                        if not is_dir:
+                            if counted:
+                                counts[file_suffix(name).lower() or "(no extension)"] += 1
+                                if largest and size is not None:
+                                    item = (size, f"{rel}{name}")
+                                    if len(top_files) < largest:
+                                        heapq.heappush(top_files, item)
+                                    elif item > top_files[0]:
+                                        heapq.heapreplace(top_files, item)
+                            if shown and emit is not None:
+                                emit({
+                                    "type": "file",
+                                    "path": f"{rel}{name}",
+                                    "size": size,
+                                    "extension": file_suffix(name).lower()
+                                })
+                            elif shown:
+                                table.add(node, FileTable.FILE, name, size)
+                            continue
+                        
+                        child = None
+                        if shown:
+                            if depth + 1 > max_depth:
+                                if emit is not None:
+                                    emit({"type": "truncated", "path": f"{rel}{name}"})
+                                else:
+                                    table.add(node, FileTable.TRUNCATED)
+                            elif emit is not None:
+                                emit({"type": "directory", "path": f"{rel}{name}"})
+                                child = True
+                            else:
+                                child = table.add(node, FileTable.DIRECTORY, name)
+                        count_child = counted and not is_symlink and name not in SKIP_DIRS and not name.startswith(".")
+                        if depth + 1 <= max_depth and (child is not None or count_child):
+                            next_level.append((os.path.join(dir_path, name), f"{rel}{name}/", child, count_child))
+            level = next_level
+            depth += 1
+    
+    entry_points = []
+    for pattern in ENTRY_PATTERNS:
+        parent, _, name = pattern.rpartition("/")
+        listing = listings.get(f"{parent}/" if parent else "")
+        if listing is not None and not listing.get(name):
+            if name in listing:
+                entry_points.append(pattern)
+        # Unlisted directories and symlinks (which may dangle) need a real check
+        elif not offline and (path / pattern).exists():
+            entry_points.append(pattern)
+    
+    result = {
+        "structure": table,
+        "file_counts": dict(sorted(counts.items(), key=lambda x: -x[1])),
+        "entry_points": entry_points,
+    }
+    if largest:
+        result["largest_files"] = [{"path": rel, "size": size} for size, rel in sorted(top_files, reverse=True)]
     return result
 
 
+def scan_directory(path: Path, max_depth: int = 5, current_depth: int = 0) -> dict:
+    """Recursively scan a directory and build structure."""
+    
+    if current_depth > max_depth:
+        return {"truncated": True}
+    
+    return scan_tree(path, max_depth - current_depth)["structure"].to_dict()
+
+
 def detect_project_type(path: Path) -> list:
     """Detect project type(s) from indicator files."""
     types = []
@@ -98,39 +621,13 @@ def detect_project_type(path: Path) -> list:
 
 def count_files_by_extension(path: Path, max_depth: int = 5) -> dict:
     """Count files by extension."""
-    counts = defaultdict(int)
-    
-    for root, dirs, files in os.walk(path):
-        # Skip unwanted directories
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
-        
-        depth = str(root).replace(str(path), "").count(os.sep)
-        if depth > max_depth:
-            continue
-        
-        for f in files:
-            ext = Path(f).suffix.lower() or "(no extension)"
-            counts[ext] += 1
-    
-    return dict(sorted(counts.items(), key=lambda x: -x[1]))
+    return scan_tree(path, max_depth, structure=False)["file_counts"]
 
 
 def find_entry_points(path: Path) -> list:
     """Find likely entry point files."""
-    entry_patterns = [
-        "index.html", "index.js", "index.ts", "index.tsx",
-        "main.js", "main.ts", "main.py",
-        "app.js", "app.ts", "app.tsx", "app.py",
-        "server.js", "server.ts", "server.py",
-        "src/index.js", "src/index.ts", "src/index.tsx",
-        "src/main.js", "src/main.ts",
-        "src/App.tsx", "src/App.js",
-        "pages/index.tsx", "pages/index.js",
-        "app/page.tsx", "app/page.js",
-    ]
-    
     found = []
-    for pattern in entry_patterns:
+    for pattern in ENTRY_PATTERNS:
         full_path = path / pattern
         if full_path.exists():
             found.append(pattern)
@@ -168,11 +665,75 @@ def get_dependencies(path: Path) -> dict:
     return deps
 
 
+def write_result(result: dict, table: FileTable, out=None) -> None:
+    """Print result with table as its "structure" key, as json.dumps(indent=2) would."""
+    out = out or sys.stdout
+    head = json.dumps(result, indent=2)
+    out.write(head[:-2] + ',\n  "structure": ')
+    out.writelines(table.iter_json(indent=2, level=1))
+    out.write("\n}\n")
+
+
+def stream_scan(path: Path, max_depth: int, use_index: bool = True, refresh: bool = False,
+                gitignore: bool = True, lister=None, out=None) -> None:
+    """Write a scan as NDJSON: a "scan" header, structure records, then a "summary".
+    
+    The header (project types, dependencies) is flushed before the walk
+    starts, and records are flushed every STREAM_BATCH directories, so
+    consumers can start on the output right away.
+    """
+    out = out or sys.stdout
+    out.write(json.dumps({
+        "type": "scan",
+        "path": str(path.absolute()),
+        "project_types": detect_project_type(path),
+        "dependencies": get_dependencies(path),
+    }) + "\n")
+    out.flush()
+    
+    written = 0
+    
+    def emit(record):
+        nonlocal written
+        out.write(json.dumps(record) + "\n")
+        written += 1
+        if written % STREAM_BATCH == 0:
+            out.flush()
+    
+    index = None
+    if use_index and lister is None:
+        index = ScanIndex(path)
+        if not refresh:
+            index.load()
+        lister = index.lister
+    scan = scan_tree(path, max_depth, lister=lister, emit=emit, gitignore=gitignore)
+    if index:
+        index.save()
+    out.write(json.dumps({
+        "type": "summary",
+        "entry_points": scan["entry_points"],
+        "file_counts": scan["file_counts"],
+        "records": written,
+    }) + "\n")
+    out.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Scan a codebase and output structure")
     parser.add_argument("path", help="Path to scan")
     parser.add_argument("--depth", type=int, default=4, help="Max depth to scan")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Stream the structure as one JSON record per line while scanning")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the scan index from scratch")
+    parser.add_argument("--no-index", action="store_true", help="Scan without reading or updating the index")
+    parser.add_argument("--query", choices=["counts", "largest", "entry-points"],
+                        help="Answer from the scan index (and .gitignore files) without walking the tree")
+    parser.add_argument("--limit", type=int, default=20, help="Files listed by --query largest")
+    parser.add_argument("--no-daemon", action="store_true", help="Scan directly even if scan_daemon.py is running")
+    parser.add_argument("--no-gitignore", action="store_true", help="Include files ignored by .gitignore")
+    parser.add_argument("--git-files", action="store_true",
+                        help="List files with 'git ls-files' instead of walking the tree")
     
     args = parser.parse_args()
     path = Path(args.path)
@@ -181,18 +742,67 @@ def main():
         print(json.dumps({"error": f"Path not found: {path}"}))
         sys.exit(1)
     
+    gitignore = not (args.no_gitignore or args.git_files)
+    git_lister = None
+    if args.git_files:
+        git_lister = git_file_lister(path)
+        if git_lister is None:
+            print(json.dumps({"error": f"Not a git checkout (or git is not installed): {path}"}))
+            sys.exit(1)
+    
+    if args.query:
+        index = ScanIndex(path)
+        if not index.load():
+            print(json.dumps({"error": f"No scan index for {path.absolute()} - run a scan first"}))
+            sys.exit(1)
+        scan = scan_tree(path, args.depth, structure=False, lister=index.offline_lister,
+                         offline=True, largest=args.limit if args.query == "largest" else 0,
+                         gitignore=gitignore)
+        key = {"counts": "file_counts", "largest": "largest_files", "entry-points": "entry_points"}[args.query]
+        print(json.dumps({"path": str(path.absolute()), key: scan[key]}, indent=2))
+        return
+    
+    if args.ndjson:
+        try:
+            stream_scan(path, args.depth, use_index=not args.no_index, refresh=args.refresh,
+                        gitignore=gitignore, lister=git_lister)
+        except BrokenPipeError:
+            # The consumer stopped reading (e.g. piped into head)
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+        return
+    
+    use_daemon = not (args.no_daemon or args.refresh or args.no_index or args.git_files)
+    request = {"cmd": "scan", "depth": args.depth, "structure": args.json, "gitignore": gitignore}
+    answer = query_daemon(path, request) if use_daemon else None
+    if answer:
+        result = {"path": str(path.absolute())}
+        for key in ("project_types", "entry_points", "file_counts", "dependencies", "structure"):
+            if key in answer:
+                result[key] = answer[key]
+        print(json.dumps(result, indent=2))
+        return
+    
+    if args.no_index or git_lister:
+        scan = scan_tree(path, args.depth, structure=args.json, lister=git_lister, gitignore=gitignore)
+    else:
+        index = ScanIndex(path)
+        if not args.refresh:
+            index.load()
+        scan = scan_tree(path, args.depth, structure=args.json, lister=index.lister, gitignore=gitignore)
+        index.save()
     result = {
         "path": str(path.absolute()),
         "project_types": detect_project_type(path),
-        "entry_points": find_entry_points(path),
-        "file_counts": count_files_by_extension(path, args.depth),
+        "entry_points": scan["entry_points"],
+        "file_counts": scan["file_counts"],
         "dependencies": get_dependencies(path),
     }
     
     if args.json:
-        result["structure"] = scan_directory(path, args.depth)
-    
-    print(json.dumps(result, indent=2))
+        write_result(result, scan["structure"])
+    else:
+        print(json.dumps(result, indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+scan_daemon.py - Keep scan_codebase results hot for a project
+
+Usage:
+    python scan_daemon.py <project_path> [--poll SECONDS]
+    python scan_daemon.py <project_path> --status | --stop
+
+Runs in the foreground (start it in the background during a session) and
+keeps directory listings, extension counts, project type and dependency
+info for one project in memory. Changes are picked up from inotify events
+on Linux (via ctypes, no extra packages), or by polling directory mtimes
+every --poll seconds elsewhere or when inotify watches run out. Polling
+notices added, removed and renamed entries, drops directories that no
+longer exist, and also compares the mtimes of the files project info is
+read from (TRACKED_FILES: package.json, requirements.txt and the entry
+points), so in-place edits to those are picked up. Other in-place edits
+only update file sizes once their directory changes.
+
+scan_codebase.py and generate_structure_report.py ask the daemon over a
+Unix socket in .tmp/scan_daemon/ first and fall back to a direct scan when
+it isn't running. Each request is one JSON line, answered with one JSON
+line: {"cmd": "scan", "depth": 4, "structure": false, "gitignore": true},
+{"cmd": "status"} or {"cmd": "stop"}.
+
+Returns:
+    JSON status lines on start and stop
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import socket
+import struct
+import select
+import argparse
+import threading
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+from scan_codebase import (
+    scan_tree, list_directory, detect_project_type, get_dependencies,
+    daemon_socket_path, query_daemon, ENTRY_PATTERNS,
+)
+
+
+POLL_INTERVAL = 2.0
+
+# Files, relative to the root, whose own mtime polling checks: manifests
+# read by get_dependencies and the entry points. Editing them in place
+# doesn't change their directory's mtime.
+TRACKED_FILES = ["package.json", "requirements.txt", *ENTRY_PATTERNS]
+
+# inotify event bits (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal inotify binding over libc."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read_events(self, timeout: float) -> list:
+        """Return [(wd, mask, name)] read within timeout (possibly empty)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events, offset = [], 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class WatchedTree:
+    """In-memory directory listings for one root, kept current by events or polling."""
+
+    def __init__(self, root: Path, poll_interval: float = POLL_INTERVAL):
+        self.root = root.resolve()
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        # rel -> [mtime_ns, entries, error]; rel is "" or "dir/sub/"
+        self.dirs = {}
+        self.dirty = set()
+        self.meta = None
+        self.watches = {}
+        self.inotify = None
+        self.mode = "polling"
+        self.events = 0
+        self.stopping = threading.Event()
+        if sys.platform.startswith("linux"):
+            try:
+                self.inotify = Inotify()
+                self.mode = "inotify"
+            except (OSError, AttributeError):
+                self.inotify = None
+
+    def _watch(self, dir_path: str, rel: str) -> None:
+        if self.inotify is None:
+            return
+        try:
+            wd = self.inotify.add_watch(dir_path)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                # Out of watches (fs.inotify.max_user_watches): poll instead
+                self.inotify.close()
+                self.inotify = None
+                self.mode = "polling"
+            return
+        self.watches.setdefault(wd, set()).add(rel)
+
+    def lister(self, dir_path: str, rel: str, with_sizes: bool) -> tuple:
+        """scan_tree lister: cached listing unless the directory changed."""
+        with self.lock:
+            cached = self.dirs.get(rel)
+            if cached is not None and rel not in self.dirty:
+                return cached[1], cached[2]
+            # Clear the flag before listing so changes during the listing
+            # mark the directory dirty again
+            self.dirty.discard(rel)
+            if cached is None:
+                self._watch(dir_path, rel)
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        entries, error = list_directory(dir_path, True)
+        with self.lock:
+            self.dirs[rel] = [mtime, entries, error]
+        return entries, error
+
+    def mark(self, rels) -> None:
+        with self.lock:
+            self.dirty.update(rels)
+            if "" in rels:
+                self.meta = None  # package.json etc. may have changed
+
+    def follow_events(self) -> None:
+        """Apply inotify events until stopped, then poll if inotify was given up."""
+        try:
+            self._read_events()
+        except Exception:
+            pass  # Fall back to polling rather than leave a dead watcher
+        if not self.stopping.is_set():
+            self.mode = "polling"
+            # Listings may have missed events; re-list everything once
+            with self.lock:
+                rels = set(self.dirs)
+            self.mark(rels)
+            self.poll()
+    
+    def _read_events(self) -> None:
+        while not self.stopping.is_set() and self.inotify is not None:
+            try:
+                events = self.inotify.read_events(0.5)
+            except OSError:
+                break
+            for wd, mask, _ in events:
+                self.events += 1
+                with self.lock:
+                    if mask & IN_Q_OVERFLOW:
+                        rels = set(self.dirs)
+                    else:
+                        rels = set(self.watches.get(wd, ()))
+                    if mask & IN_IGNORED:
+                        self.watches.pop(wd, None)
+                        for rel in rels:
+                            self.dirs.pop(rel, None)
+                        continue
+                self.mark(rels)
+
+    def _tracked_mtimes(self) -> dict:
+        mtimes = {}
+        for rel in TRACKED_FILES:
+            try:
+                st = os.stat(self.root / rel)
+                mtimes[rel] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                mtimes[rel] = None
+        return mtimes
+
+    def poll(self) -> None:
+        """Mark directories whose mtime (or tracked files) changed, every poll_interval seconds."""
+        tracked = self._tracked_mtimes()
+        while not self.stopping.wait(self.poll_interval):
+            with self.lock:
+                known = [(rel, entry[0]) for rel, entry in self.dirs.items()]
+            changed, gone = set(), set()
+            for rel, mtime in known:
+                try:
+                    if os.stat(self.root / rel).st_mtime_ns != mtime:
+                        changed.add(rel)
+                except OSError:
+                    gone.add(rel)
+            listed = {rel for rel, _ in known}
+            current = self._tracked_mtimes()
+            for rel, state in current.items():
+                parent = rel[:rel.rfind("/") + 1]
+                if state != tracked[rel] and parent in listed:
+                    # Re-list the parent (for sizes); the root also resets project info
+                    changed.add(parent)
+            tracked = current
+            if gone:
+                # Deleted (or replaced) directories: the parent's listing is
+                # refreshed through its own mtime; forget them and their subtrees
+                with self.lock:
+                    for rel in list(self.dirs):
+                        if any(rel.startswith(prefix) for prefix in gone):
+                            del self.dirs[rel]
+                            self.dirty.discard(rel)
+            if changed:
+                self.mark(changed)
+
+    def start(self) -> None:
+        target = self.follow_events if self.inotify is not None else self.poll
+        threading.Thread(target=target, daemon=True).start()
+
+    def scan(self, depth: int, structure: bool, gitignore: bool = True) -> dict:
+        result = scan_tree(self.root, depth, structure=structure, lister=self.lister, gitignore=gitignore)
+        with self.lock:
+            meta = self.meta
+        if meta is None:
+            meta = {"project_types": detect_project_type(self.root), "dependencies": get_dependencies(self.root)}
+            with self.lock:
+                self.meta = meta
+        answer = {
+            "project_types": meta["project_types"],
+            "entry_points": result["entry_points"],
+            "file_counts": result["file_counts"],
+            "dependencies": meta["dependencies"],
+        }
+        if structure:
+            answer["structure"] = result["structure"].to_dict()
+        return answer
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                "root": str(self.root),
+                "pid": os.getpid(),
+                "mode": self.mode,
+                "directories": len(self.dirs),
+                "dirty": len(self.dirty),
+                "watches": len(self.watches),
+                "events": self.events,
+            }
+
+
+def handle(tree: WatchedTree, conn: socket.socket) -> None:
+    conn.settimeout(30)
+    with conn:
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        try:
+            request = json.loads(data)
+            command = request.get("cmd")
+            if command == "scan":
+                started = time.monotonic()
+                response = tree.scan(int(request.get("depth", 4)), bool(request.get("structure", False)),
+                                     bool(request.get("gitignore", True)))
+                response["daemon_ms"] = round((time.monotonic() - started) * 1000, 2)
+            elif command == "status":
+                response = tree.status()
+            elif command == "stop":
+                response = {"stopping": True}
+                tree.stopping.set()
+            else:
+                response = {"error": f"Unknown command: {command!r}"}
+        except (ValueError, AttributeError, TypeError) as e:
+            response = {"error": f"Bad request: {e}"}
+        conn.sendall(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def serve(root: Path, poll_interval: float = POLL_INTERVAL) -> None:
+    socket_path = daemon_socket_path(root)
+    if query_daemon(root, {"cmd": "status"}, timeout=2):
+        print(json.dumps({"error": f"A scan daemon is already watching {root.resolve()}"}))
+        sys.exit(1)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()  # Left behind by a daemon that didn't exit cleanly
+
+    tree = WatchedTree(root, poll_interval)
+    tree.start()
+    tree.scan(4, False)  # Warm the listings (and watches) up front
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    os.chmod(socket_path, 0o600)
+    server.listen(16)
+    # Wake up regularly to notice a stop request
+    server.settimeout(0.5)
+    print(json.dumps({"started": True, "socket": str(socket_path), **tree.status()}), flush=True)
+
+    try:
+        while not tree.stopping.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            threading.Thread(target=handle, args=(tree, conn), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tree.stopping.set()
+        server.close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+        print(json.dumps({"stopped": True, "root": str(tree.root)}), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep scan_codebase results hot for a project")
+    parser.add_argument("path", help="Project directory to watch")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL,
+                        help=f"Polling interval without inotify (default: {POLL_INTERVAL}s)")
+    parser.add_argument("--status", action="store_true", help="Show the running daemon's status")
+    parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+
+    args = parser.parse_args()
+    path = Path(args.path)
+
+    if not path.is_dir():
+        print(json.dumps({"error": f"Path not found: {path}"}))
+        sys.exit(1)
+    if not hasattr(socket, "AF_UNIX"):
+        print(json.dumps({"error": "Unix sockets are not available on this platform"}))
+        sys.exit(1)
+
+    if args.status or args.stop:
+        response = query_daemon(path, {"cmd": "stop" if args.stop else "status"}, timeout=2)
+        print(json.dumps(response or {"running": False}, indent=2))
+        sys.exit(0 if response else 1)
+
+    serve(path, args.poll)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+verify_deps.py - Check installed node_modules against package-lock.json
+
+Usage:
+    python verify_deps.py <project_path> [--no-cache]
+
+Reads the "packages" section of package-lock.json (lockfile v2/v3) one entry
+at a time with json.JSONDecoder.raw_decode instead of loading the whole
+file, then compares each locked version with the version in the installed
+node_modules/<name>/package.json. The package.json files are read by a
+thread pool, and versions are cached in .tmp/deps_index/ keyed by each
+file's mtime and size, so re-verification mostly costs a stat per package.
+
+Returns:
+    JSON with missing and mismatched packages
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from cache_files import keyed_file, write_json
+
+
+INDEX_DIR = Path(__file__).resolve().parent.parent / ".tmp" / "deps_index"
+
+# Lockfile fields kept per package
+LOCK_FIELDS = ("version", "optional", "devOptional", "link", "resolved")
+
+READ_BLOCK = 256 * 1024
+MAX_WORKERS = 16
+# Problems listed in full in the report (counts always cover all of them)
+MAX_LISTED = 50
+
+
+class LockfileReader:
+    """Incremental JSON reader over a file, built on raw_decode."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        block = self.f.read(READ_BLOCK)
+        if not block:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def next_char(self) -> str:
+        """Skip whitespace and return (without consuming) the next character."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.next_char()
+        if found != char:
+            raise ValueError(f"package-lock.json: expected {char!r}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more as needed."""
+        self.next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # A value cut off by the block boundary: read more and retry
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next block
+            at_end = end == len(self.buffer) and not isinstance(value, (dict, list, str))
+            if at_end and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """Iterate (key, reader) over an object; the caller consumes each value."""
+        self.expect("{")
+        if self.next_char() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key, self
+            char = self.next_char()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"package-lock.json: expected ',' or '}}', found {char!r}")
+
+
+def read_locked_packages(lockfile: Path) -> dict:
+    """Stream the "packages" section of a lockfile into {path: fields}.
+
+    Returns None for lockfiles without a "packages" section (lockfile v1).
+    Reading stops once the section has been consumed, so v2 lockfiles never
+    decode their duplicate legacy "dependencies" tree.
+    """
+    with open(lockfile, "r", encoding="utf-8") as f:
+        reader = LockfileReader(f)
+        for key, member in reader.members():
+            if key != "packages":
+                member.value()
+                continue
+            packages = {}
+            for path, entry in member.members():
+                fields = entry.value()
+                if path.startswith("node_modules/") or "/node_modules/" in path:
+                    packages[path] = {name: fields[name] for name in LOCK_FIELDS if name in fields}
+            return packages
+    return None
+
+
+def index_file(project_path: Path) -> Path:
+    return keyed_file(INDEX_DIR, str(project_path.resolve()))
+
+
+def load_index(project_path: Path) -> dict:
+    try:
+        index = json.loads(index_file(project_path).read_text(encoding="utf-8"))
+        if isinstance(index.get("versions"), dict):
+            return index
+    except (OSError, json.JSONDecodeError):
+        pass
+    return {"versions": {}}
+
+
+def save_index(project_path: Path, index: dict) -> None:
+    write_json(index_file(project_path), index)
+
+
+def installed_version(project_path: Path, package: str, known: dict) -> tuple:
+    """Return (package, [mtime_ns, size, version]) for an installed package.
+
+    Uses the cached version when package.json's mtime and size are unchanged;
+    the entry is None when the package is not installed.
+    """
+    manifest = os.path.join(project_path, package, "package.json")
+    try:
+        st = os.stat(manifest)
+    except OSError:
+        return package, None
+    previous = known.get(package)
+    if previous and previous[0] == st.st_mtime_ns and previous[1] == st.st_size:
+        return package, previous
+    try:
+        with open(manifest, "r", encoding="utf-8") as f:
+            version = json.load(f).get("version")
+    except (OSError, json.JSONDecodeError, AttributeError):
+        version = None
+    return package, [st.st_mtime_ns, st.st_size, version]
+
+
+def verify_dependencies(project_path: Path, use_cache: bool = True) -> dict:
+    """Compare the locked dependency tree with what is installed.
+
+    Returns {"status": ...} where status is "ok", "stale", "missing"
+    (no node_modules), "no_lockfile", "unsupported" (lockfile v1) or
+    "invalid_lockfile". Only "stale" and "missing" are not ok; the others
+    can't be checked and fall back to node_modules existing.
+    """
+    started = time.monotonic()
+    lockfile = project_path / "package-lock.json"
+    node_modules = project_path / "node_modules"
+
+    def report(status, **fields):
+        duration = round(time.monotonic() - started, 3)
+        return {"status": status, **fields, "duration_seconds": duration}
+
+    if not lockfile.exists():
+        return report("no_lockfile", ok=node_modules.is_dir())
+    if not node_modules.is_dir():
+        return report("missing", ok=False, message="node_modules directory not found")
+
+    index = load_index(project_path) if use_cache else {"versions": {}}
+    try:
+        locked = read_locked_packages(lockfile)
+    except (ValueError, UnicodeDecodeError) as e:
+        return report("invalid_lockfile", ok=True, message=f"Could not read package-lock.json: {e}")
+    if locked is None:
+        return report("unsupported", ok=True,
+                      message="Lockfile v1 has no \"packages\" section; "
+                              "only checked node_modules exists")
+
+    workers = min(MAX_WORKERS, (os.cpu_count() or 1) * 4)
+    known = index["versions"]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        installed = dict(pool.map(
+            lambda package: installed_version(project_path, package, known), locked))
+
+    missing, mismatched = [], []
+    for package, fields in locked.items():
+        found = installed[package]
+        if found is None:
+            # Optional packages for other platforms are legitimately absent
+            if not (fields.get("optional") or fields.get("devOptional")):
+                missing.append({"package": package, "locked": fields.get("version")})
+        elif fields.get("version") and not fields.get("link") and found[2] != fields["version"]:
+            mismatched.append({"package": package, "locked": fields["version"],
+                               "installed": found[2]})
+
+    index["versions"] = {package: found for package, found in installed.items()
+                         if found is not None}
+    if use_cache:
+        save_index(project_path, index)
+
+    ok = not missing and not mismatched
+    result = report(
+        "ok" if ok else "stale",
+        ok=ok,
+        packages=len(locked),
+        missing_count=len(missing),
+        mismatched_count=len(mismatched),
+        missing=missing[:MAX_LISTED],
+        mismatched=mismatched[:MAX_LISTED],
+    )
+    if not ok:
+        result["message"] = ("node_modules does not match package-lock.json - "
+                             "run 'npm ci' (or 'npm install')")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check installed node_modules against package-lock.json")
+    parser.add_argument("project_path", help="Project directory containing package-lock.json")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-read every installed package.json")
+
+    args = parser.parse_args()
+    project_path = Path(args.project_path)
+
+    if not project_path.exists():
+        print(json.dumps({"ok": False, "message": f"Path not found: {project_path}"}))
+        sys.exit(1)
+
+    result = verify_dependencies(project_path, not args.no_cache)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()